@@ -9,6 +9,7 @@ import json
 import time
 import re
 import functools
+import heapq
 import threading
 import concurrent.futures
 from concurrent.futures import ThreadPoolExecutor
@@ -32,6 +33,13 @@ STOCK_DATA_CACHE = {}  # Cache for stock data
 ANNOUNCEMENT_CACHE = {}  # Cache for announcements
 CACHE_TTL = 3600  # Cache time-to-live in seconds (1 hour)
 
+# Expiry queues of (expiry_ts, cache_key), pushed on every cache write so the
+# cleanup thread only has to pop the entries that are actually due
+MESSAGE_CACHE_RETENTION = 3600  # 1 hour
+STOCK_DATA_CACHE_RETENTION = 7200  # 2 hours
+MESSAGE_EXPIRY_HEAP = []
+STOCK_EXPIRY_HEAP = []
+
 # Common stock symbols for caching and pre-initialization
 COMMON_SYMBOLS = [
     "AAPL", "MSFT", "GOOGL", "AMZN", "META", "TSLA", "NVDA", "JPM", 
@@ -287,6 +295,7 @@ def cache_result(func):
                 "result": result,
                 "timestamp": datetime.now()
             }
+            heapq.heappush(MESSAGE_EXPIRY_HEAP, (time.time() + MESSAGE_CACHE_RETENTION, cache_key))
         
         return result
     return wrapper
@@ -492,6 +501,7 @@ def get_cached_stock_data(symbol: str, start_date: datetime, end_date: datetime,
                 "data": existing_data,
                 "timestamp": datetime.now()
             }
+            heapq.heappush(STOCK_EXPIRY_HEAP, (time.time() + STOCK_DATA_CACHE_RETENTION, cache_key))
         return existing_data
     
     # If not in cache, fetch the data
@@ -567,6 +577,7 @@ def get_cached_stock_data(symbol: str, start_date: datetime, end_date: datetime,
                 "data": data,
                 "timestamp": datetime.now()
             }
+            heapq.heappush(STOCK_EXPIRY_HEAP, (time.time() + STOCK_DATA_CACHE_RETENTION, cache_key))
         
         return data
     except Exception as e:
@@ -591,6 +602,7 @@ def get_cached_stock_data(symbol: str, start_date: datetime, end_date: datetime,
                             "timestamp": datetime.now(),
                             "is_default_data": True
                         }
+                        heapq.heappush(STOCK_EXPIRY_HEAP, (time.time() + STOCK_DATA_CACHE_RETENTION, cache_key))
                     
                     return df
                 # If DEFAULT_STOCK_DATA is already a DataFrame (from previous versions)
@@ -604,6 +616,7 @@ def get_cached_stock_data(symbol: str, start_date: datetime, end_date: datetime,
                             "timestamp": datetime.now(),
                             "is_default_data": True
                         }
+                        heapq.heappush(STOCK_EXPIRY_HEAP, (time.time() + STOCK_DATA_CACHE_RETENTION, cache_key))
                     
                     return df
             except Exception as inner_e:
@@ -5,13 +5,17 @@ These endpoints provide analysis of corporate announcements to detect misleading
 
 from fastapi import APIRouter, Body, BackgroundTasks
 from typing import Optional, Dict
+import os
+import json
 import time
 import re
 from datetime import datetime
 import logging
 import functools
+import heapq
 import threading
 from corporate_announcement_verifier import verify_corporate_announcement
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 
 # Setup logging
@@ -23,6 +27,21 @@ response_cache = {}
 cache_lock = threading.Lock()
 CACHE_TTL = 300  # 5 minutes cache TTL
 
+# Expiry queue of (expiry_ts, cache_key) consumed by the cleanup thread in main.py
+API_CACHE_RETENTION = 1800  # 30 minutes
+API_EXPIRY_HEAP = []
+
+# Optional Redis store shared by all workers; entries expire server-side via SET ... EX
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS = None
+if REDIS_URL:
+    try:
+        import redis.asyncio as aioredis
+        REDIS = aioredis.Redis.from_url(REDIS_URL)
+        logger.info("Using Redis for API response cache")
+    except ImportError:
+        logger.warning("REDIS_URL is set but redis is not installed, using in-process cache")
+
 def cache_api_response(ttl=CACHE_TTL):
     """
     Decorator to cache API responses for specified time-to-live
@@ -53,6 +72,7 @@ def cache_api_response(ttl=CACHE_TTL):
                     "data": response,
                     "timestamp": time.time()
                 }
+                heapq.heappush(API_EXPIRY_HEAP, (time.time() + API_CACHE_RETENTION, cache_key))
             
             return response
         return wrapper
@@ -86,24 +106,43 @@ def cache_api_response(ttl=CACHE_TTL):
             cache_key = f"{func.__name__}:{request.symbol}:{request.announcement_text}:{request.announcement_date}"
             
             # Check cache
-            with cache_lock:
-                if cache_key in response_cache:
-                    entry = response_cache[cache_key]
-                    if (datetime.now() - entry["timestamp"]).total_seconds() < ttl:
-                        logger.info(f"Cache hit for {func.__name__}")
-                        return entry["result"]
+            if REDIS is not None:
+                try:
+                    cached = await REDIS.get(f"api:{cache_key}")
+                    if cached is not None:
+                        logger.info(f"Redis cache hit for {func.__name__}")
+                        return json.loads(cached)
+                except Exception as e:
+                    logger.warning(f"Redis cache read failed: {e}")
+            else:
+                with cache_lock:
+                    if cache_key in response_cache:
+                        entry = response_cache[cache_key]
+                        if (datetime.now() - entry["timestamp"]).total_seconds() < ttl:
+                            logger.info(f"Cache hit for {func.__name__}")
+                            return entry["result"]
             
             # Execute function
             start_time = time.time()
             result = await func(*args, **kwargs)
             execution_time = time.time() - start_time
             
-            # Store in cache
+            # Store in cache, encoded the way FastAPI encodes the response, so a Redis hit
+            # returns the same JSON shape as a miss; results it can't encode aren't cached
+            if REDIS is not None:
+                try:
+                    await REDIS.set(f"api:{cache_key}", json.dumps(jsonable_encoder(result)), ex=ttl)
+                except Exception as e:
+                    logger.warning(f"Redis cache write failed: {e}")
+                logger.info(f"API call {func.__name__} completed in {execution_time:.2f}s")
+                return result
+            
             with cache_lock:
                 response_cache[cache_key] = {
                     "result": result,
                     "timestamp": datetime.now()
                 }
+                heapq.heappush(API_EXPIRY_HEAP, (time.time() + API_CACHE_RETENTION, cache_key))
             
             # Log performance
             logger.info(f"API call {func.__name__} completed in {execution_time:.2f}s")
@@ -11,6 +11,7 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Union
 from collections import defaultdict
+import time
 import requests
 
 # Configure logging
@@ -21,6 +22,7 @@ logger = logging.getLogger(__name__)
 MAX_HISTORY_PERIOD = "5y"  # Maximum history to retrieve
 MANIPULATION_WINDOW_DAYS = 30  # Window for looking at manipulation patterns
 VOLATILITY_WINDOW = 20  # Days for volatility calculation
+INTRADAY_INTERVALS = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"}
 TYPICAL_PATTERNS = {
     "pump_dump": {
         "description": "Sharp price increase followed by rapid decline, often with elevated volume",
@@ -52,6 +54,10 @@ TYPICAL_PATTERNS = {
     }
 }
 
+def ohlc_cache_ttl(interval: str) -> int:
+    """Seconds downloaded price data stays fresh: 4 hours for intraday bars, 24 hours otherwise"""
+    return 4 * 3600 if interval in INTRADAY_INTERVALS else 24 * 3600
+
 class HistoricalMarketAnalyzer:
     """
     AI-driven historical market data analyzer that can detect patterns of
@@ -67,13 +73,16 @@ class HistoricalMarketAnalyzer:
     
     def get_historical_data(self, symbol: str, period: str = "1y", interval: str = "1d", force_refresh: bool = False) -> pd.DataFrame:
         """
-        Fetch and cache historical market data for a symbol
+        Fetch and cache historical market data for a symbol. Callers get their own copy,
+        since the analyzers add columns to it and requests run on worker threads.
         """
         cache_key = f"{symbol}_{period}_{interval}"
         
-        # Return cached data if available and not forced to refresh
+        # Return cached data if available, still fresh and not forced to refresh
         if not force_refresh and cache_key in self.data_cache:
-            return self.data_cache[cache_key]
+            fetched_at, data = self.data_cache[cache_key]
+            if time.time() - fetched_at < ohlc_cache_ttl(interval):
+                return data.copy()
         
         # Handle different market extensions
         symbol_variations = [
@@ -84,10 +93,14 @@ class HistoricalMarketAnalyzer:
         
         for sym in symbol_variations:
             try:
-                data = yf.download(sym, period=period, interval=interval, progress=False, session=self.session)
+                # yf.download keeps its results in module globals, so it isn't safe on
+                # concurrent threads; Ticker.history keeps them per instance
+                data = yf.Ticker(sym, session=self.session).history(
+                    period=period, interval=interval, auto_adjust=False, actions=False
+                )
                 if not data.empty and len(data) > 5:  # Ensure we have meaningful data
-                    self.data_cache[cache_key] = data
-                    return data
+                    self.data_cache[cache_key] = (time.time(), data)
+                    return data.copy()
             except Exception as e:
                 logger.warning(f"Error fetching data for {sym}: {e}")
         
@@ -27,13 +27,8 @@ def fetch_circular_text(url):
     paras = [p.get_text(strip=True) for p in soup.find_all('p')]
     return '\n'.join(paras)
 
-# 2. Gemini embedding API (textembedding-gecko)
-def gemini_embed(text):
-    endpoint = "https://generativelanguage.googleapis.com/v1beta/models/embedding-001:embedContent?key=" + GEMINI_API_KEY
-    data = {"content": {"parts": [{"text": text}]}}
-    r = requests.post(endpoint, json=data)
-    r.raise_for_status()
-    return r.json()['embedding']['values']
+# 2. Gemini embedding API (textembedding-gecko), shared pooled session from llm_utils
+from llm_utils import gemini_embed
 
 # 3. Ingest and embed
 if __name__ == "__main__":
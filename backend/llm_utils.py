@@ -1,6 +1,9 @@
 
 import os
+import threading
 import requests
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 # Always load .env from the backend directory
@@ -8,6 +11,10 @@ dotenv_path = os.path.join(os.path.dirname(__file__), '.env')
 load_dotenv(dotenv_path=dotenv_path)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+# One pooled session for all Gemini calls so TLS connections are reused
+GEMINI_SESSION = requests.Session()
+GEMINI_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
 def gemini_llm(prompt, context=None):
     endpoint = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
     headers = {
@@ -18,6 +25,59 @@ def gemini_llm(prompt, context=None):
     if context:
         parts.insert(0, {"text": context})
     data = {"contents": [{"parts": parts}]}
-    r = requests.post(endpoint, headers=headers, json=data)
+    r = GEMINI_SESSION.post(endpoint, headers=headers, json=data)
     r.raise_for_status()
     return r.json()['candidates'][0]['content']['parts'][0]['text']
+
+# Embeddings are deterministic per text, so repeated queries are served from memory
+EMBED_CACHE_SIZE = 4096
+EMBED_MODEL = "models/embedding-001"
+_embed_cache = OrderedDict()  # text -> embedding values, least recently used first
+_embed_cache_lock = threading.Lock()
+
+def _cached_embedding(text):
+    with _embed_cache_lock:
+        values = _embed_cache.get(text)
+        if values is not None:
+            _embed_cache.move_to_end(text)
+        return values
+
+def _store_embedding(text, values):
+    with _embed_cache_lock:
+        _embed_cache[text] = values
+        while len(_embed_cache) > EMBED_CACHE_SIZE:
+            _embed_cache.popitem(last=False)
+
+def gemini_embed(text):
+    values = _cached_embedding(text)
+    if values is None:
+        endpoint = f"https://generativelanguage.googleapis.com/v1beta/{EMBED_MODEL}:embedContent"
+        headers = {
+            "Content-Type": "application/json",
+            "X-goog-api-key": GEMINI_API_KEY,
+        }
+        data = {"content": {"parts": [{"text": text}]}}
+        r = GEMINI_SESSION.post(endpoint, headers=headers, json=data, timeout=10)
+        r.raise_for_status()
+        values = tuple(r.json()['embedding']['values'])
+        _store_embedding(text, values)
+    return list(values)
+
+def gemini_embed_batch(texts):
+    """Embed several texts, fetching the uncached ones with a single batchEmbedContents call"""
+    embeddings = {text: _cached_embedding(text) for text in texts}
+    missing = [text for text, values in embeddings.items() if values is None]
+    if missing:
+        endpoint = f"https://generativelanguage.googleapis.com/v1beta/{EMBED_MODEL}:batchEmbedContents"
+        headers = {
+            "Content-Type": "application/json",
+            "X-goog-api-key": GEMINI_API_KEY,
+        }
+        data = {"requests": [{"model": EMBED_MODEL, "content": {"parts": [{"text": text}]}} for text in missing]}
+        r = GEMINI_SESSION.post(endpoint, headers=headers, json=data, timeout=10)
+        r.raise_for_status()
+        for text, embedding in zip(missing, r.json()['embeddings']):
+            values = tuple(embedding['values'])
+            _store_embedding(text, values)
+            embeddings[text] = values
+    return [list(embeddings[text]) for text in texts]
@@ -8,17 +8,26 @@ dashboard_stats = {
 }
 stats_lock = Lock()
 
+def record_check(is_fraud, advisor_regnos=()):
+    """Count one verification in the dashboard stats under a single lock acquisition"""
+    with stats_lock:
+        dashboard_stats["total_checks"] += 1
+        if is_fraud:
+            dashboard_stats["fraud_alerts"] += 1
+        dashboard_stats["unique_advisors_verified"].update(advisor_regnos)
+
 # --- Imports and Setup ---
 
 import os
-import shutil
 import requests
-import tempfile
+import aiofiles
+import aiofiles.tempfile
 import pandas as pd
 from datetime import datetime
 from fastapi import FastAPI, File, UploadFile, Form
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 from chromadb import Client
 from chromadb.config import Settings
@@ -82,13 +91,45 @@ except Exception as e:
 
 # Add memory management and cleanup functions
 import time
+import heapq
 import threading
 import gc
+from concurrent.futures import ThreadPoolExecutor
 
 # Track application startup time
 startup_time = time.time()
-from corporate_announcement_routes import response_cache, cache_lock
-from announcement_utils import STOCK_DATA_CACHE, stock_data_lock, MESSAGE_CACHE, cache_lock as message_cache_lock
+from corporate_announcement_routes import response_cache, cache_lock, API_EXPIRY_HEAP, API_CACHE_RETENTION, REDIS
+from announcement_utils import (
+    STOCK_DATA_CACHE, stock_data_lock, STOCK_EXPIRY_HEAP, STOCK_DATA_CACHE_RETENTION,
+    MESSAGE_CACHE, cache_lock as message_cache_lock, MESSAGE_EXPIRY_HEAP, MESSAGE_CACHE_RETENTION
+)
+
+def _cache_entry_age(entry, current_time):
+    """Age in seconds of a cache entry, whether it was stamped with a datetime or time.time()"""
+    timestamp = entry["timestamp"]
+    if isinstance(timestamp, datetime):
+        timestamp = timestamp.timestamp()
+    return current_time - timestamp
+
+def evict_expired(cache, lock, expiry_heap, retention, current_time):
+    """
+    Pop due keys off an expiry heap and drop them from the cache.
+
+    The lock is taken per key rather than for the whole sweep so writers are
+    never blocked for long. A key that was rewritten after being queued is
+    kept, its newer heap entry will expire it later.
+    """
+    removed = 0
+    while True:
+        with lock:
+            if not expiry_heap or expiry_heap[0][0] > current_time:
+                break
+            _, key = heapq.heappop(expiry_heap)
+            entry = cache.get(key)
+            if entry is not None and _cache_entry_age(entry, current_time) >= retention:
+                del cache[key]
+                removed += 1
+    return removed
 
 def cleanup_expired_caches():
     """Periodically clean up expired cache entries to free memory"""
@@ -96,46 +137,19 @@ def cleanup_expired_caches():
         try:
             current_time = time.time()
             # Clean up API response cache
-            with cache_lock:
-                expired_keys = []
-                for key, value in response_cache.items():
-                    if current_time - value["timestamp"] > 1800:  # 30 minutes
-                        expired_keys.append(key)
-                        
-                for key in expired_keys:
-                    del response_cache[key]
-                    
-                if expired_keys:
-                    print(f"Cleaned {len(expired_keys)} expired API cache entries")
+            removed = evict_expired(response_cache, cache_lock, API_EXPIRY_HEAP, API_CACHE_RETENTION, current_time)
+            if removed:
+                print(f"Cleaned {removed} expired API cache entries")
             
             # Clean up stock data cache
-            with stock_data_lock:
-                expired_keys = []
-                for key, value in STOCK_DATA_CACHE.items():
-                    if (datetime.now() - value["timestamp"]).total_seconds() > 7200:  # 2 hours
-                        expired_keys.append(key)
-                        
-                for key in expired_keys:
-                    del STOCK_DATA_CACHE[key]
-                    
-                if expired_keys:
-                    print(f"Cleaned {len(expired_keys)} expired stock data cache entries")
+            removed = evict_expired(STOCK_DATA_CACHE, stock_data_lock, STOCK_EXPIRY_HEAP, STOCK_DATA_CACHE_RETENTION, current_time)
+            if removed:
+                print(f"Cleaned {removed} expired stock data cache entries")
             
             # Clean up message analysis cache
-            with message_cache_lock:
-                expired_keys = []
-                for key, value in MESSAGE_CACHE.items():
-                    if current_time - value["timestamp"] > 3600:  # 1 hour
-                        expired_keys.append(key)
-                        
-                for key in expired_keys:
-                    del MESSAGE_CACHE[key]
-                    
-                if expired_keys:
-                    print(f"Cleaned {len(expired_keys)} expired message cache entries")
-            
-            # Run garbage collection
-            gc.collect()
+            removed = evict_expired(MESSAGE_CACHE, message_cache_lock, MESSAGE_EXPIRY_HEAP, MESSAGE_CACHE_RETENTION, current_time)
+            if removed:
+                print(f"Cleaned {removed} expired message cache entries")
             
         except Exception as e:
             print(f"Error in cache cleanup: {str(e)}")
@@ -143,54 +157,92 @@ def cleanup_expired_caches():
         # Sleep for 15 minutes before next cleanup
         time.sleep(900)
 
+# Latest CPU usage and ISO timestamp, refreshed once per second by a background
+# sampler so health checks never block on psutil or re-format the current time
+LAST_CPU_PERCENT = 0.0
+LAST_ISO_TS = datetime.now().isoformat()
+
+def sample_system_metrics():
+    """Continuously refresh LAST_CPU_PERCENT and LAST_ISO_TS"""
+    global LAST_CPU_PERCENT, LAST_ISO_TS
+    try:
+        import psutil
+    except ImportError:
+        print("psutil not available for system metrics")
+        psutil = None
+    
+    while True:
+        try:
+            if psutil is not None:
+                LAST_CPU_PERCENT = psutil.cpu_percent(interval=1.0)
+            else:
+                time.sleep(1)
+        except Exception as e:
+            print(f"Error sampling CPU usage: {str(e)}")
+            time.sleep(1)
+        LAST_ISO_TS = datetime.now().isoformat()
+
 # Use FastAPI startup and shutdown events for better resource management
 cleanup_thread = None
 
+# Shared pool for background warm-up work
+PREFETCH_POOL = ThreadPoolExecutor(max_workers=3, thread_name_prefix="prefetch")
+
 @app.on_event("startup")
 def startup_event():
     """Startup handler to initialize resources"""
     global cleanup_thread
     
+    # Collect once after the heavy imports, then move the long-lived module objects
+    # (advisor data, ChromaDB client, routers) out of future GC passes
+    gc.collect()
+    gc.freeze()
+    
     # Start the cleanup thread
     cleanup_thread = threading.Thread(target=cleanup_expired_caches, daemon=True)
     cleanup_thread.start()
     
-    # Warm up caches for common symbols
+    # Start the CPU/timestamp sampler used by /api/health and /api/verify-text
+    threading.Thread(target=sample_system_metrics, daemon=True).start()
+    
+    # Warm up caches for common symbols on the shared prefetch pool
     from announcement_utils import prefetch_data
-    from concurrent.futures import ThreadPoolExecutor
     
     common_symbols = ["RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "INFY.NS", "ICICIBANK.NS"]
     
-    # Start prefetch in background using thread pool for better management
-    def prefetch_startup_data():
-        try:
-            with ThreadPoolExecutor(max_workers=3) as executor:
-                executor.map(prefetch_data, common_symbols)
-            print(f"Prefetched data for {len(common_symbols)} common symbols")
-        except Exception as e:
-            print(f"Error during prefetch: {str(e)}")
-    
-    threading.Thread(target=prefetch_startup_data, daemon=True).start()
+    for symbol in common_symbols:
+        PREFETCH_POOL.submit(prefetch_data, symbol)
+    print(f"Scheduled prefetch for {len(common_symbols)} common symbols")
         
     print("FastAPI startup complete with optimized caching")
 
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
     """Shutdown handler to clean up resources"""
+    PREFETCH_POOL.shutdown(wait=False)
+    if REDIS is not None:
+        await REDIS.close()
+    
     # Clear caches to free memory
     with cache_lock:
         response_cache.clear()
+        API_EXPIRY_HEAP.clear()
     
     with stock_data_lock:
         STOCK_DATA_CACHE.clear()
+        STOCK_EXPIRY_HEAP.clear()
     
     with message_cache_lock:
         MESSAGE_CACHE.clear()
+        MESSAGE_EXPIRY_HEAP.clear()
     
     # Force garbage collection
     gc.collect()
     print("FastAPI shutdown complete with memory cleanup")
 
+# Most Redis keys a health probe counts before reporting the cap instead
+HEALTH_KEY_COUNT_CAP = 1000
+
 @app.get("/api/health")
 async def health_check():
     """
@@ -201,8 +253,19 @@ async def health_check():
     stock_cache_size = 0
     message_cache_size = 0
     
-    with cache_lock:
-        api_cache_size = len(response_cache)
+    if REDIS is not None:
+        # The Redis DB may be shared, so count only api:* keys, stopping at a cap so a
+        # probe never walks a large keyspace
+        try:
+            async for _ in REDIS.scan_iter(match="api:*", count=500):
+                api_cache_size += 1
+                if api_cache_size >= HEALTH_KEY_COUNT_CAP:
+                    break
+        except Exception as e:
+            print(f"Error reading Redis cache size: {str(e)}")
+    else:
+        with cache_lock:
+            api_cache_size = len(response_cache)
     
     with stock_data_lock:
         stock_cache_size = len(STOCK_DATA_CACHE)
@@ -219,7 +282,7 @@ async def health_check():
         import psutil
         memory_usage = psutil.virtual_memory()
         memory_percent = memory_usage.percent
-        cpu_percent = psutil.cpu_percent(interval=0.1)
+        cpu_percent = LAST_CPU_PERCENT
     except ImportError:
         # Log that psutil is not available but continue
         print("psutil not available for system metrics")
@@ -228,7 +291,7 @@ async def health_check():
     
     return {
         "status": "ok",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": LAST_ISO_TS,
         "caches": {
             "api_responses": api_cache_size,
             "stock_data": stock_cache_size,
@@ -255,15 +318,12 @@ async def hybrid_verify(request: Request):
         # Log the incoming message for debugging
         print(f"[API] Received verification request for message: {message[:50]}...")
         
-        # Track stats
-        with stats_lock:
-            dashboard_stats["total_checks"] += 1
-            
         # Call the verification function with error handling
         try:
-            result = hybrid_verify_message(message)
+            result = await run_in_threadpool(hybrid_verify_message, message)
         except Exception as e:
             print(f"[ERROR] Error in hybrid_verify_message: {str(e)}")
+            record_check(is_fraud=False)
             # Return a more user-friendly error response
             return {
                 "summary": "Error",
@@ -275,10 +335,8 @@ async def hybrid_verify(request: Request):
                 "error": str(e)
             }
             
-        # If we found fraud, track in stats
-        if result and not result.get("is_valid", True):
-            with stats_lock:
-                dashboard_stats["fraud_alerts"] += 1
+        # Track stats, counting fraud if we found it
+        record_check(is_fraud=bool(result) and not result.get("is_valid", True))
                 
         return result
         
@@ -292,11 +350,45 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 # Load advisor data once at startup
 ADVISOR_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "sebi_advisors_clean.csv")
+# Only the columns controller_agent matches on and the frontend displays
+ADVISOR_COLUMNS = ["Name", "Registration No.", "Address"]
 if os.path.exists(ADVISOR_CSV):
-    advisor_df = pd.read_csv(ADVISOR_CSV)
+    advisor_df = pd.read_csv(
+        ADVISOR_CSV,
+        usecols=lambda col: col in ADVISOR_COLUMNS,
+        dtype="string",
+        keep_default_na=False
+    )
 else:
     advisor_df = pd.DataFrame()
 
+# Lowercased advisor names -> first row position of each distinct name, plus one
+# alternation regex over them so controller_agent scans the text once instead of per
+# advisor. The alternation is longest-first inside a lookahead, so it reports the
+# longest name at every start position, overlaps included; the other names starting
+# there are prefixes of it, so each reported name expands to its prefix names.
+# Registration numbers are indexed the same way, uppercased.
+ADVISOR_NAME_TO_IDX = {}
+ADVISOR_NAME_PREFIXES = {}
+ADVISOR_NAME_RE = None
+REGNO_INDEX = {}
+if not advisor_df.empty:
+    for idx, regno in enumerate(advisor_df['Registration No.'].astype(str).str.upper()):
+        REGNO_INDEX.setdefault(regno, idx)
+    first_rows = {}
+    for idx, name in enumerate(advisor_df['Name']):
+        if isinstance(name, str) and name.strip() and name not in first_rows:
+            first_rows[name] = idx
+            ADVISOR_NAME_TO_IDX.setdefault(name.lower(), []).append(idx)
+    ADVISOR_NAME_PREFIXES = {
+        name: [name[:k] for k in range(1, len(name) + 1) if name[:k] in ADVISOR_NAME_TO_IDX]
+        for name in ADVISOR_NAME_TO_IDX
+    }
+    if ADVISOR_NAME_TO_IDX:
+        ADVISOR_NAME_RE = re.compile(
+            '(?=(' + '|'.join(re.escape(n) for n in sorted(ADVISOR_NAME_TO_IDX, key=len, reverse=True)) + '))'
+        )
+
 # --- Data Models ---
 class VerificationRequest(BaseModel):
     content: str
@@ -394,16 +486,21 @@ def controller_agent(user_text):
     if not advisor_df.empty:
         # Check for registration numbers (e.g., INH000011431)
         regnos = re.findall(r'IN[HR]\d{9,}', user_text, re.IGNORECASE)
+        # Collect matching row positions first and materialize them in one go below
+        hit_indices = []
         for reg in regnos:
-            match = advisor_df[advisor_df['Registration No.'].str.upper() == reg.upper()]
-            if not match.empty:
-                found_advisors.append(match.iloc[0].to_dict())
-        # Check for advisor names (case-insensitive substring match)
-        for name in advisor_df['Name']:
-            if name.lower() in user_text.lower():
-                match = advisor_df[advisor_df['Name'] == name]
-                if not match.empty:
-                    found_advisors.append(match.iloc[0].to_dict())
+            idx = REGNO_INDEX.get(reg.upper())
+            if idx is not None:
+                hit_indices.append(idx)
+        # Check for advisor names (case-insensitive substring match), in list order
+        if ADVISOR_NAME_RE is not None:
+            name_indices = set()
+            for hit in ADVISOR_NAME_RE.findall(user_text.lower()):
+                for name in ADVISOR_NAME_PREFIXES[hit]:
+                    name_indices.update(ADVISOR_NAME_TO_IDX[name])
+            hit_indices.extend(sorted(name_indices))
+        if hit_indices:
+            found_advisors = advisor_df.iloc[list(dict.fromkeys(hit_indices))].to_dict(orient='records')
         if found_advisors:
             return {
                 "source": "SEBI Advisor List",
@@ -438,31 +535,27 @@ def controller_agent(user_text):
 
 # --- API Endpoint ---
 @app.post("/api/verify", response_model=VerificationResponse)
-def verify_content(request: VerificationRequest):
-    with stats_lock:
-        dashboard_stats["total_checks"] += 1
+async def verify_content(request: VerificationRequest):
     # Use controller agent for verification
-    result = controller_agent(request.content)
-    # If fraud detected, increment fraud_alerts
-    if result.get("is_valid") is False:
-        with stats_lock:
-            dashboard_stats["fraud_alerts"] += 1
+    result = await run_in_threadpool(controller_agent, request.content)
     # If advisor(s) verified, add to set
+    regnos = []
     if result.get("source") == "SEBI Advisor List" and result.get("is_valid"):
-        with stats_lock:
-            for adv in result.get("context", []):
-                dashboard_stats["unique_advisors_verified"].add(adv.get("Registration No.", ""))
+        regnos = [adv.get("Registration No.", "") for adv in result.get("context", [])]
+    # If fraud detected, increment fraud_alerts
+    record_check(is_fraud=result.get("is_valid") is False, advisor_regnos=regnos)
     return result
 
 # --- Dashboard Stats Endpoint ---
 @app.get("/api/dashboard_stats")
 def get_dashboard_stats():
     with stats_lock:
-        return JSONResponse({
+        stats = {
             "total_checks": dashboard_stats["total_checks"],
             "fraud_alerts": dashboard_stats["fraud_alerts"],
             "unique_advisors_verified": len(dashboard_stats["unique_advisors_verified"]),
-        })
+        }
+    return JSONResponse(stats)
 
 # --- Agent Status Endpoint ---
 @app.get("/api/agent-status")
@@ -500,8 +593,12 @@ def get_agent_status():
 class TextVerificationRequest(BaseModel):
     content: str
 
+# Fixed risk scores per classification; anything else is scored from its alerts
+RISK_BY_CLASSIFICATION = {"SCAM": 90, "UNKNOWN": 50}
+NEWS_CLASSIFICATIONS = frozenset({"NEWS"})
+
 @app.post("/api/verify-text")
-def verify_text_api(request: TextVerificationRequest):
+async def verify_text_api(request: TextVerificationRequest):
     try:
         print(f"Received text verification request: {request}")
         
@@ -532,14 +629,11 @@ def verify_text_api(request: TextVerificationRequest):
         
         # Use the hybrid verification agent
         print(f"Processing text: {user_text[:100]}...")
-        result = hybrid_verify_message(user_text)
+        result = await run_in_threadpool(hybrid_verify_message, user_text)
         print(f"Verification result: {result}")
         
         # Update dashboard stats
-        with stats_lock:
-            dashboard_stats["total_checks"] += 1
-            if result.get("is_suspicious"):
-                dashboard_stats["fraud_alerts"] += 1
+        record_check(is_fraud=bool(result.get("is_suspicious")))
         
         # Check for contradictions in the response
         classification = result.get("classification", "")
@@ -551,14 +645,12 @@ def verify_text_api(request: TextVerificationRequest):
             classification = "UNKNOWN"
             result["classification"] = classification
         
-        # If classification is NEWS but summary is Fraudulent/Scam, fix the contradiction
-        if classification == "NEWS" and result.get("summary", "") == "Fraudulent/Scam":
-            print(f"WARNING: Fixing contradiction - NEWS classified as Fraudulent")
-            is_valid = True
-            result["summary"] = "Authentic/News"
-        
         # Special handling for NEWS classification - always mark as not suspicious
-        if classification == "NEWS":
+        if classification in NEWS_CLASSIFICATIONS:
+            # If summary is Fraudulent/Scam, fix the contradiction
+            if result.get("summary", "") == "Fraudulent/Scam":
+                print(f"WARNING: Fixing contradiction - NEWS classified as Fraudulent")
+                result["summary"] = "Authentic/News"
             print(f"Setting NEWS classification to not suspicious")
             is_valid = True
             
@@ -566,17 +658,15 @@ def verify_text_api(request: TextVerificationRequest):
         is_suspicious = not is_valid
         
         # Calculate risk score based on classification and alerts
-        risk_score = 0
-        if classification == "SCAM":
-            risk_score = 90
-        elif classification == "UNKNOWN":
-            risk_score = 50
-        elif result.get("pump_dump_alerts"):
-            max_risk = max([alert.get("risk_score", 0) for alert in result.get("pump_dump_alerts", [])] or [0])
-            risk_score = max(risk_score, max_risk)
-        elif result.get("sentiment_alerts"):
-            max_confidence = max([alert.get("confidence", 0) * 100 for alert in result.get("sentiment_alerts", [])] or [0])
-            risk_score = max(risk_score, max_confidence)
+        risk_score = RISK_BY_CLASSIFICATION.get(classification)
+        if risk_score is None:
+            risk_score = 0
+            if result.get("pump_dump_alerts"):
+                max_risk = max([alert.get("risk_score", 0) for alert in result.get("pump_dump_alerts", [])] or [0])
+                risk_score = max(risk_score, max_risk)
+            elif result.get("sentiment_alerts"):
+                max_confidence = max([alert.get("confidence", 0) * 100 for alert in result.get("sentiment_alerts", [])] or [0])
+                risk_score = max(risk_score, max_confidence)
         
         # Safety check for result
         if not result or not isinstance(result, dict):
@@ -588,40 +678,25 @@ def verify_text_api(request: TextVerificationRequest):
                 "risk_score": 0.0
             }
             
-        # Create response data with defaults for all fields
+        # Create response data with defaults for all fields, so no value is ever None/null
         response_data = {
             "status": "success",
             "verification_status": "Suspicious" if is_suspicious else "Clean",
             "is_suspicious": is_suspicious,
-            "risk_score": int(risk_score),  # Ensure it's an integer, not float
-            "message": result.get("summary", "No summary available"),
-            "reason": result.get("reason", "No reason available"),
+            "risk_score": int(risk_score or 0),  # Ensure it's an integer, not float
+            "message": result.get("summary") or "No summary available",
+            "reason": result.get("reason") or "No reason available",
             "classification": classification,  # Use our sanitized classification
-            "verified_companies": result.get("verified_companies", []),
-            "suspicious_companies": result.get("suspicious_companies", []),
-            "sebi_rag": result.get("sebi_rag", ""),
-            "pump_dump_alerts": result.get("pump_dump_alerts", []),
-            "sentiment_alerts": result.get("sentiment_alerts", []),
-            "campaign_alerts": result.get("campaign_alerts", []),
-            "processing_time": result.get("elapsed_seconds", 0.0),
-            "timestamp": datetime.now().isoformat()
+            "verified_companies": result.get("verified_companies") or [],
+            "suspicious_companies": result.get("suspicious_companies") or [],
+            "sebi_rag": result.get("sebi_rag") or "",
+            "pump_dump_alerts": result.get("pump_dump_alerts") or [],
+            "sentiment_alerts": result.get("sentiment_alerts") or [],
+            "campaign_alerts": result.get("campaign_alerts") or [],
+            "processing_time": result.get("elapsed_seconds") or 0.0,
+            "timestamp": LAST_ISO_TS
         }
         
-        # Double check that no values are None/null - replace with defaults if they are
-        for key in response_data:
-            if response_data[key] is None:
-                if key in ["verified_companies", "suspicious_companies", "pump_dump_alerts", 
-                          "sentiment_alerts", "campaign_alerts"]:
-                    response_data[key] = []
-                elif key == "risk_score":
-                    response_data[key] = 0
-                elif key == "is_suspicious":
-                    response_data[key] = False
-                elif key in ["message", "reason", "classification", "sebi_rag"]:
-                    response_data[key] = ""
-                elif key == "processing_time":
-                    response_data[key] = 0.0
-        
         # Print the response for debugging
         print(f"Sending response: {response_data}")
         return response_data
@@ -646,21 +721,23 @@ def verify_text_api(request: TextVerificationRequest):
             "sentiment_alerts": [],
             "campaign_alerts": [],
             "processing_time": 0.0,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": LAST_ISO_TS,
             "error_details": str(error_details)
         }
 
 @app.post("/verify_company", response_model=CompanyVerificationResponse)
-def verify_company_api(req: CompanyVerificationRequest):
-    result = verify_company_yfinance(req.query)
+async def verify_company_api(req: CompanyVerificationRequest):
+    result = await run_in_threadpool(verify_company_yfinance, req.query)
+    return CompanyVerificationResponse(nse=result.get('nse', {}), bse=result.get('bse', {}))
     
 # --- Document Verification Endpoint ---
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
 @app.post("/api/verify_document")
 async def verify_document_api(file: UploadFile = File(...)):
-    # Create a temporary file to store the uploaded file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file.filename.split('.')[-1]}") as temp_file:
-        # Copy uploaded file to the temporary file
-        shutil.copyfileobj(file.file, temp_file)
+    # Stream the upload to a temporary file in 1 MiB chunks without blocking the event loop
+    async with aiofiles.tempfile.NamedTemporaryFile('wb', delete=False, suffix=f".{file.filename.split('.')[-1]}") as temp_file:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await temp_file.write(chunk)
         temp_path = temp_file.name
     
     try:
@@ -672,13 +749,10 @@ async def verify_document_api(file: UploadFile = File(...)):
             file_type = "pdf"
             
         # Process the document
-        result = verify_document(temp_path, file_type)
+        result = await run_in_threadpool(verify_document, temp_path, file_type)
         
         # Update dashboard stats
-        with stats_lock:
-            dashboard_stats["total_checks"] += 1
-            if result.get("is_suspicious"):
-                dashboard_stats["fraud_alerts"] += 1
+        record_check(is_fraud=bool(result.get("is_suspicious")))
                 
         return result
     except Exception as e:
@@ -687,4 +761,3 @@ async def verify_document_api(file: UploadFile = File(...)):
         # Clean up the temporary file
         if os.path.exists(temp_path):
             os.unlink(temp_path)
-    return CompanyVerificationResponse(nse=result.get('nse', {}), bse=result.get('bse', {}))
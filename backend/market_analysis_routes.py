@@ -5,23 +5,95 @@ These endpoints provide AI-first analysis of financial data.
 
 from fastapi import APIRouter, Query
 from typing import Optional, List
+import os
+import re
+import math
+import time
+import asyncio
+import logging
+import threading
+from collections import defaultdict
 import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from numpy.lib.stride_tricks import sliding_window_view
 from pump_and_dump_detector import analyze_pump_and_dump
-from historical_market_analyzer import get_historical_analysis, compare_with_market
+from historical_market_analyzer import get_historical_analysis, compare_with_market, ohlc_cache_ttl
+
+logger = logging.getLogger(__name__)
 
 # Create router
 router = APIRouter()
 
+# Annualisation factor for daily return volatility
+_SQRT_252 = math.sqrt(252.0)
+
+# OHLC downloads cached in-process as (symbol, period, interval) -> (fetched_at, DataFrame),
+# and on disk as parquet so a cold start does not have to go back to Yahoo. get_ohlc runs
+# on worker threads, so each key has a lock: concurrent misses for the same key wait for
+# one download and parquet write instead of repeating them.
+_OHLC_CACHE = {}
+_OHLC_KEY_LOCKS = defaultdict(threading.Lock)
+_ohlc_locks_lock = threading.Lock()
+OHLC_CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache")
+
+def _ohlc_cache_path(symbol: str, period: str, interval: str) -> str:
+    safe_symbol = re.sub(r"[^A-Za-z0-9._-]", "_", symbol)
+    return os.path.join(OHLC_CACHE_DIR, f"{safe_symbol}_{period}_{interval}.parquet")
+
+def get_ohlc(symbol: str, period: str, interval: str) -> pd.DataFrame:
+    """
+    Download OHLC data for a symbol, reusing a cached copy while it is fresh.
+    Intraday intervals are kept for 4 hours, daily and longer for 24 hours.
+    """
+    key = (symbol, period, interval)
+    ttl = ohlc_cache_ttl(interval)
+    
+    cached = _OHLC_CACHE.get(key)
+    if cached is not None and time.time() - cached[0] < ttl:
+        return cached[1]
+    
+    with _ohlc_locks_lock:
+        key_lock = _OHLC_KEY_LOCKS[key]
+    with key_lock:
+        # Another thread may have filled the entry while this one waited
+        now = time.time()
+        cached = _OHLC_CACHE.get(key)
+        if cached is not None and now - cached[0] < ttl:
+            return cached[1]
+        
+        path = _ohlc_cache_path(symbol, period, interval)
+        try:
+            if os.path.exists(path) and now - os.path.getmtime(path) < ttl:
+                data = pd.read_parquet(path)
+                _OHLC_CACHE[key] = (os.path.getmtime(path), data)
+                return data
+        except Exception as e:
+            logger.warning(f"Could not read OHLC cache file {path}: {e}")
+        
+        # Single symbol: go straight to Ticker.history and skip yf.download's multi-ticker
+        # thread/concat machinery; auto_adjust=False keeps the same Close/Adj Close columns
+        data = yf.Ticker(symbol).history(period=period, interval=interval, auto_adjust=False, actions=False)
+        if not data.empty:
+            _OHLC_CACHE[key] = (now, data)
+            try:
+                os.makedirs(OHLC_CACHE_DIR, exist_ok=True)
+                # Write then rename, so other workers never read a half-written file
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                data.to_parquet(tmp_path)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logger.warning(f"Could not write OHLC cache file {path}: {e}")
+        return data
+
 @router.get("/api/pump_and_dump")
 async def pump_and_dump(symbol: str):
     """
     Analyze a stock symbol for potential pump and dump schemes.
     Uses historical price and volume data along with pattern recognition.
     """
-    result = analyze_pump_and_dump(symbol)
+    result = await asyncio.to_thread(analyze_pump_and_dump, symbol)
     return result
 
 @router.get("/api/historical_analysis")
@@ -29,7 +101,7 @@ async def historical_analysis(
     symbol: str, 
     period: str = "1y", 
     interval: str = "1d",
-    indicators: Optional[List[str]] = Query(["sma", "volatility"])
+    indicators: Optional[List[str]] = Query(["sma", "volatility", "volume"])
 ):
     """
     Perform comprehensive historical analysis of a stock with technical indicators.
@@ -39,21 +111,25 @@ async def historical_analysis(
     - symbol: Stock ticker symbol
     - period: Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
     - interval: Data interval (1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo, 3mo)
-    - indicators: Technical indicators to calculate (sma, ema, rsi, macd, volatility, bollinger)
+    - indicators: Technical indicators to calculate (sma, ema, rsi, macd, volatility, bollinger, volume)
     """
     try:
         # Fetch historical data
-        data = yf.download(symbol, period=period, interval=interval)
+        data = await asyncio.to_thread(get_ohlc, symbol, period, interval)
         
         if data.empty:
             return {"error": "No data available for this symbol"}
         
+        # Indicators work on the raw close array; the cached frame itself is never modified
+        close = data["Close"].to_numpy(dtype=np.float64)
+        first_close, last_close = float(close[0]), float(close[-1])
+        
         # Calculate requested indicators
         results = {
             "symbol": symbol,
-            "last_price": float(data["Close"].iloc[-1]),
-            "price_change": float(data["Close"].iloc[-1] - data["Close"].iloc[0]),
-            "price_change_pct": float((data["Close"].iloc[-1] / data["Close"].iloc[0] - 1) * 100),
+            "last_price": last_close,
+            "price_change": last_close - first_close,
+            "price_change_pct": (last_close / first_close - 1) * 100,
             "data_points": len(data),
             "indicators": {},
             "anomalies": [],
@@ -62,25 +138,31 @@ async def historical_analysis(
         
         # Technical indicators
         if "sma" in indicators:
-            data["SMA20"] = data["Close"].rolling(window=20).mean()
-            data["SMA50"] = data["Close"].rolling(window=50).mean()
-            data["SMA200"] = data["Close"].rolling(window=200).mean()
+            # Only the latest and previous SMA values are needed, so average just those tail slices
+            def sma_at(window, offset=0):
+                """SMA over `window` bars ending `offset` bars before the last one, None if too few bars"""
+                end = len(close) - offset
+                if end < window:
+                    return None
+                return float(close[end - window:end].mean())
             
+            sma20_last, sma50_last = sma_at(20), sma_at(50)
             results["indicators"]["sma"] = {
-                "sma20": float(data["SMA20"].iloc[-1]) if not pd.isna(data["SMA20"].iloc[-1]) else None,
-                "sma50": float(data["SMA50"].iloc[-1]) if not pd.isna(data["SMA50"].iloc[-1]) else None,
-                "sma200": float(data["SMA200"].iloc[-1]) if not pd.isna(data["SMA200"].iloc[-1]) else None,
+                "sma20": sma20_last,
+                "sma50": sma50_last,
+                "sma200": sma_at(200),
             }
             
             # Detect golden/death crosses
-            if len(data) >= 50:
-                if data["SMA20"].iloc[-1] > data["SMA50"].iloc[-1] and data["SMA20"].iloc[-2] < data["SMA50"].iloc[-2]:
+            sma20_prev, sma50_prev = sma_at(20, 1), sma_at(50, 1)
+            if sma50_prev is not None:
+                if sma20_last > sma50_last and sma20_prev < sma50_prev:
                     results["anomalies"].append({
                         "type": "golden_cross", 
                         "description": "Golden Cross detected: SMA20 crossed above SMA50",
                         "significance": "bullish"
                     })
-                elif data["SMA20"].iloc[-1] < data["SMA50"].iloc[-1] and data["SMA20"].iloc[-2] > data["SMA50"].iloc[-2]:
+                elif sma20_last < sma50_last and sma20_prev > sma50_prev:
                     results["anomalies"].append({
                         "type": "death_cross", 
                         "description": "Death Cross detected: SMA20 crossed below SMA50",
@@ -89,23 +171,23 @@ async def historical_analysis(
         
         if "volatility" in indicators:
             # Calculate daily returns
-            data["returns"] = data["Close"].pct_change()
+            returns = np.diff(close) / close[:-1]
             
-            # Calculate volatility (standard deviation of returns)
-            vol_20d = float(data["returns"].rolling(window=20).std() * np.sqrt(252))
-            vol_50d = float(data["returns"].rolling(window=50).std() * np.sqrt(252))
+            # Calculate current volatility (standard deviation of the latest returns)
+            vol_20d = float(returns[-20:].std(ddof=1) * _SQRT_252) if len(returns) >= 20 else None
+            vol_50d = float(returns[-50:].std(ddof=1) * _SQRT_252) if len(returns) >= 50 else None
             
             results["indicators"]["volatility"] = {
-                "current_20d": float(vol_20d) if not pd.isna(vol_20d) else None,
-                "current_50d": float(vol_50d) if not pd.isna(vol_50d) else None,
+                "current_20d": vol_20d if vol_20d is not None and not np.isnan(vol_20d) else None,
+                "current_50d": vol_50d if vol_50d is not None and not np.isnan(vol_50d) else None,
             }
             
             # Detect volatility anomalies
             if len(data) >= 100:
                 # Calculate historical volatility average and standard deviation
-                vol_history = data["returns"].rolling(window=20).std() * np.sqrt(252)
-                vol_avg = float(vol_history.mean())
-                vol_std = float(vol_history.std())
+                vol_history = sliding_window_view(returns, 20).std(axis=1, ddof=1) * _SQRT_252
+                vol_avg = float(np.nanmean(vol_history))
+                vol_std = float(np.nanstd(vol_history, ddof=1))
                 
                 # Check if current volatility is unusually high
                 if vol_20d > vol_avg + 2 * vol_std:
@@ -116,9 +198,10 @@ async def historical_analysis(
                     })
         
         # Add volume analysis
-        if "Volume" in data.columns:
-            avg_vol = float(data["Volume"].mean())
-            recent_vol = float(data["Volume"].iloc[-1])
+        if "volume" in indicators and "Volume" in data.columns:
+            volume = data["Volume"].to_numpy(dtype=np.float64)
+            avg_vol = float(volume.mean())
+            recent_vol = float(volume[-1])
             vol_change = (recent_vol / avg_vol - 1) * 100
             
             results["indicators"]["volume"] = {
@@ -137,7 +220,8 @@ async def historical_analysis(
         
         # Generate AI-driven summary
         trend = "upward" if results["price_change"] > 0 else "downward"
-        volatility_desc = "high" if results["indicators"].get("volatility", {}).get("current_20d", 0) > 0.3 else "moderate" if results["indicators"].get("volatility", {}).get("current_20d", 0) > 0.15 else "low"
+        current_vol = (results["indicators"].get("volatility") or {}).get("current_20d") or 0.0
+        volatility_desc = "high" if current_vol > 0.3 else "moderate" if current_vol > 0.15 else "low"
         
         summary_text = f"{symbol} has shown a {trend} trend over the selected period with {volatility_desc} volatility. "
         
@@ -193,7 +277,7 @@ async def historical_patterns(symbol: str):
     AI-driven analysis of historical market patterns to detect potential market manipulation.
     """
     try:
-        result = get_historical_analysis(symbol)
+        result = await asyncio.to_thread(get_historical_analysis, symbol)
         return result
     except Exception as e:
         return {"error": str(e)}
@@ -204,7 +288,7 @@ async def market_comparison(symbol: str, market_index: str = "^NSEI"):
     Compare a stock's performance with the broader market to identify unusual behavior.
     """
     try:
-        result = compare_with_market(symbol, market_index)
+        result = await asyncio.to_thread(compare_with_market, symbol, market_index)
         return result
     except Exception as e:
         return {"error": str(e)}
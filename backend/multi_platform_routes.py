@@ -1,14 +1,56 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Union
 import asyncio
+import heapq
+import logging
+from itertools import islice
+from operator import itemgetter
 from datetime import datetime
 
 from reddit_monitor import reddit_monitor
 from discord_monitor import discord_monitor
 from telegram_routes import monitor as telegram_monitor  # Use existing Telegram monitor instance
+from social_cache import ttl_cache, invalidates_cache, single_flight, encode_json, etag_response
 
-router = APIRouter(prefix="/api/social", tags=["Multi-Platform Social Media Monitoring"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/social",
+    tags=["Multi-Platform Social Media Monitoring"],
+    default_response_class=ORJSONResponse
+)
+
+# Static catalogue served by /platforms
+SUPPORTED_PLATFORMS = {
+    "platforms": [
+        {
+            "name": "telegram",
+            "display_name": "Telegram",
+            "description": "Monitor Telegram groups and channels",
+            "free": True,
+            "requires_setup": True,
+            "setup_requirements": ["TELEGRAM_API_ID", "TELEGRAM_API_HASH", "TELEGRAM_PHONE"]
+        },
+        {
+            "name": "reddit",
+            "display_name": "Reddit",
+            "description": "Monitor Reddit subreddits",
+            "free": True,
+            "requires_setup": True,
+            "setup_requirements": ["REDDIT_CLIENT_ID", "REDDIT_CLIENT_SECRET"]
+        },
+        {
+            "name": "discord",
+            "display_name": "Discord",
+            "description": "Monitor Discord servers and channels",
+            "free": True,
+            "requires_setup": True,
+            "setup_requirements": ["DISCORD_BOT_TOKEN"]
+        }
+    ]
+}
 
 # Request models
 class AddPlatformGroupRequest(BaseModel):
@@ -23,8 +65,8 @@ class RemovePlatformGroupRequest(BaseModel):
 @router.on_event("startup")
 async def startup_event():
     """Initialize all social media monitoring platforms"""
-    # Initialize Reddit
-    reddit_monitor.initialize()
+    # Initialize Reddit (PRAW is blocking, so keep it off the event loop)
+    await asyncio.to_thread(reddit_monitor.initialize)
     
     # Initialize Discord
     await discord_monitor.initialize()
@@ -35,27 +77,39 @@ async def startup_event():
         "ValueInvesting", "StockMarket", "cryptocurrency"
     ]
     for subreddit in default_subreddits:
-        reddit_monitor.add_subreddit(subreddit)
+        await asyncio.to_thread(reddit_monitor.add_subreddit, subreddit)
+
+# Seconds the status-style GETs are cached server-side; clients revalidate them by ETag
+STATUS_TTL = 5
+STATS_TTL = 15
+GROUPS_TTL = 10
+# The platform list never changes at runtime, so clients and shared caches may keep it
+PLATFORMS_MAX_AGE = 3600
 
 @router.get("/status")
-async def get_multi_platform_status():
+async def get_multi_platform_status(request: Request):
     """Get status of all social media monitoring platforms"""
-    return {
+    return etag_response(request, await _status_response())
+
+@ttl_cache(seconds=STATUS_TTL)
+async def _status_response():
+    # Query the platforms concurrently; the sync monitors run in worker threads
+    telegram_status, reddit_status, discord_status = await asyncio.gather(
+        get_telegram_status_safe(),
+        asyncio.to_thread(reddit_monitor.get_status),
+        asyncio.to_thread(discord_monitor.get_status)
+    )
+    return encode_json({
         "platforms": {
-            "telegram": (
-                await get_telegram_status_safe()
-            ),
-            "reddit": reddit_monitor.get_status(),
-            "discord": discord_monitor.get_status()
+            "telegram": telegram_status,
+            "reddit": reddit_status,
+            "discord": discord_status
         },
-        "total_active_platforms": sum([
-            1 for status in [
-                (await get_telegram_status_safe()).get("active", False),
-                reddit_monitor.get_status()["active"],
-                discord_monitor.get_status()["active"]
-            ] if status
-        ])
-    }
+        "total_active_platforms": sum(
+            1 for status in (telegram_status, reddit_status, discord_status)
+            if status.get("active", False)
+        )
+    })
 
 async def get_telegram_status_safe():
     try:
@@ -68,7 +122,7 @@ async def get_telegram_status_safe():
                         is_authenticated = await telegram_monitor.client.is_user_authorized()
                 except Exception:
                     pass
-            stats = telegram_monitor.get_monitoring_stats()
+            stats = await asyncio.to_thread(telegram_monitor.get_monitoring_stats)
             return {
                 "active": getattr(telegram_monitor, 'running', False),
                 "authenticated": is_authenticated,
@@ -78,58 +132,53 @@ async def get_telegram_status_safe():
         pass
     return {"active": False, "error": "Not configured"}
 
-@router.get("/stats")
-async def get_multi_platform_stats():
-    """Get combined statistics from all platforms"""
-    telegram_stats = {}
+async def get_telegram_stats_safe():
     try:
         if telegram_monitor:
-            telegram_stats = telegram_monitor.get_monitoring_stats()
+            return await asyncio.to_thread(telegram_monitor.get_monitoring_stats)
     except Exception:
-        telegram_stats = {"total_groups": 0, "weekly_messages": 0, "weekly_fraud_detected": 0, "weekly_high_risk": 0}
-    
-    reddit_stats = reddit_monitor.get_monitoring_stats()
-    discord_stats = discord_monitor.get_monitoring_stats()
+        return {"total_groups": 0, "weekly_messages": 0, "weekly_fraud_detected": 0, "weekly_high_risk": 0}
+    return {}
+
+# Combined stat -> the matching key in the (telegram, reddit, discord) stats
+COMBINED_STAT_FIELDS = (
+    ("total_groups", ("total_groups", "total_subreddits", "total_servers")),
+    ("weekly_messages", ("weekly_messages", "weekly_posts", "weekly_messages")),
+    ("weekly_fraud_detected", ("weekly_fraud_detected", "weekly_fraud_detected", "weekly_fraud_detected")),
+    ("weekly_high_risk", ("weekly_high_risk", "weekly_high_risk", "weekly_high_risk")),
+)
+
+@router.get("/stats")
+async def get_multi_platform_stats(request: Request):
+    """Get combined statistics from all platforms"""
+    return etag_response(request, await _stats_response())
+
+@ttl_cache(seconds=STATS_TTL)
+async def _stats_response():
+    telegram_stats, reddit_stats, discord_stats = await asyncio.gather(
+        get_telegram_stats_safe(),
+        asyncio.to_thread(reddit_monitor.get_monitoring_stats),
+        asyncio.to_thread(discord_monitor.get_monitoring_stats)
+    )
     
-    return {
+    stats_list = (telegram_stats, reddit_stats, discord_stats)
+    return encode_json({
         "combined": {
-            "total_groups": (
-                telegram_stats.get("total_groups", 0) + 
-                reddit_stats.get("total_subreddits", 0) + 
-                discord_stats.get("total_servers", 0)
-            ),
-            "weekly_messages": (
-                telegram_stats.get("weekly_messages", 0) + 
-                reddit_stats.get("weekly_posts", 0) + 
-                discord_stats.get("weekly_messages", 0)
-            ),
-            "weekly_fraud_detected": (
-                telegram_stats.get("weekly_fraud_detected", 0) + 
-                reddit_stats.get("weekly_fraud_detected", 0) + 
-                discord_stats.get("weekly_fraud_detected", 0)
-            ),
-            "weekly_high_risk": (
-                telegram_stats.get("weekly_high_risk", 0) + 
-                reddit_stats.get("weekly_high_risk", 0) + 
-                discord_stats.get("weekly_high_risk", 0)
-            )
+            field: sum(stats.get(key, 0) for stats, key in zip(stats_list, keys))
+            for field, keys in COMBINED_STAT_FIELDS
         },
         "by_platform": {
             "telegram": telegram_stats,
             "reddit": reddit_stats,
             "discord": discord_stats
         }
-    }
+    })
 
-@router.get("/groups")
-async def get_all_monitored_groups():
-    """Get all monitored groups across all platforms"""
+async def _telegram_groups():
     groups = []
-    
-    # Telegram groups
     try:
         if telegram_monitor:
-            telegram_groups = telegram_monitor.get_monitored_groups()
+            telegram_groups = await asyncio.to_thread(telegram_monitor.get_monitored_groups)
             for group in telegram_groups:
                 groups.append({
                     "platform": "telegram",
@@ -138,40 +187,59 @@ async def get_all_monitored_groups():
                     "added_date": group.get("added_date"),
                     "status": group.get("status", "active")
                 })
-    except Exception as e:
-        print(f"Error getting Telegram groups: {e}", exc_info=True)
-    
-    # Reddit subreddits
-    reddit_subreddits = reddit_monitor.get_monitored_subreddits()
-    for subreddit in reddit_subreddits:
-        groups.append({
+    except Exception:
+        logger.exception("Error getting Telegram groups")
+    return groups
+
+async def _reddit_groups():
+    reddit_subreddits = await asyncio.to_thread(reddit_monitor.get_monitored_subreddits)
+    return [
+        {
             "platform": "reddit",
             "group_id": subreddit["subreddit_id"],
             "group_name": subreddit["subreddit_name"],
             "added_date": subreddit["added_date"],
             "status": subreddit["status"]
-        })
-    
-    # Discord servers
-    discord_servers = discord_monitor.get_monitored_servers()
-    for server in discord_servers:
-        groups.append({
+        }
+        for subreddit in reddit_subreddits
+    ]
+
+async def _discord_groups():
+    discord_servers = await asyncio.to_thread(discord_monitor.get_monitored_servers)
+    return [
+        {
             "platform": "discord",
             "group_id": server["server_id"],
             "group_name": server["server_name"],
             "added_date": server["added_date"],
             "status": server["status"]
-        })
+        }
+        for server in discord_servers
+    ]
+
+@router.get("/groups")
+async def get_all_monitored_groups(request: Request):
+    """Get all monitored groups across all platforms"""
+    return etag_response(request, await _groups_response())
+
+@ttl_cache(seconds=GROUPS_TTL)
+async def _groups_response():
+    results = await asyncio.gather(_telegram_groups(), _reddit_groups(), _discord_groups())
+    groups = [group for platform_groups in results for group in platform_groups]
     
-    return {"groups": groups, "total_count": len(groups)}
+    return encode_json({"groups": groups, "total_count": len(groups)})
 
 @router.post("/add_group")
+@invalidates_cache
 async def add_group_to_monitoring(request: AddPlatformGroupRequest):
     """Add a group/channel to monitoring for specified platform"""
     platform = request.platform.lower()
-    
+    # Duplicate concurrent adds (e.g. a double-click) share one upstream call
+    return await single_flight(("add_group", platform, request.group_identifier), _add_group, platform, request)
+
+async def _add_group(platform: str, request: AddPlatformGroupRequest):
     if platform == "reddit":
-        result = reddit_monitor.add_subreddit(request.group_identifier)
+        result = await asyncio.to_thread(reddit_monitor.add_subreddit, request.group_identifier)
         return result
     
     elif platform == "discord":
@@ -181,24 +249,19 @@ async def add_group_to_monitoring(request: AddPlatformGroupRequest):
     elif platform == "telegram":
         try:
             if telegram_monitor:
-                print(f"Attempting to add Telegram group: {request.group_identifier}")
+                logger.debug("Adding Telegram group %s", request.group_identifier)
                 result = await telegram_monitor.add_group_by_link(request.group_identifier)
-                print(f"Telegram monitor response: {result}")
                 # Normalize response to current schema
                 if result.get("success"):
-                    print(f"Successfully added group. Result: {result}")
                     return result
                 error_msg = result.get("error", "Failed to add Telegram group")
-                print(f"Error adding group: {error_msg}")
+                logger.warning("Could not add Telegram group %s: %s", request.group_identifier, error_msg)
                 return {"success": False, "error": error_msg}
             else:
-                error_msg = "Telegram monitoring not configured"
-                print(error_msg)
-                return {"success": False, "error": error_msg}
+                return {"success": False, "error": "Telegram monitoring not configured"}
         except Exception as e:
-            error_msg = f"Failed to add Telegram group: {e}"
-            print(error_msg, exc_info=True)
-            return {"success": False, "error": error_msg}
+            logger.exception("Failed to add Telegram group %s", request.group_identifier)
+            return {"success": False, "error": f"Failed to add Telegram group: {e}"}
     
     else:
         raise HTTPException(status_code=400, detail=f"Unsupported platform: {platform}")
@@ -206,6 +269,7 @@ async def add_group_to_monitoring(request: AddPlatformGroupRequest):
 from fastapi import Body
 
 @router.delete("/remove_group")
+@invalidates_cache
 async def remove_group_from_monitoring(
     platform: Optional[str] = None,
     group_identifier: Optional[str] = None,
@@ -231,6 +295,9 @@ async def remove_group_from_monitoring(
     if not platform or not group_identifier:
         raise HTTPException(status_code=400, detail="Both platform and group_identifier are required")
     
+    return await single_flight(("remove_group", platform, group_identifier), _remove_group, platform, group_identifier)
+
+async def _remove_group(platform: str, group_identifier: str):
     if platform == "reddit":
         result = reddit_monitor.remove_subreddit(group_identifier)
         return result
@@ -247,11 +314,8 @@ async def remove_group_from_monitoring(
                 try:
                     gid = int(group_identifier)
                 except Exception:
-                    # If not an int, try to resolve via list
-                    for g in telegram_monitor.get_monitored_groups():
-                        if group_identifier in [str(g.get("group_id")), g.get("group_name"), g.get("group_username", "")]:
-                            gid = g.get("group_id")
-                            break
+                    # If not an int, resolve the name or username
+                    gid = await asyncio.to_thread(telegram_monitor.resolve_group, group_identifier)
                 if gid is None:
                     return {"success": False, "error": "Telegram group not found"}
                 result = await telegram_monitor.remove_group(gid)
@@ -264,161 +328,172 @@ async def remove_group_from_monitoring(
     else:
         raise HTTPException(status_code=400, detail=f"Unsupported platform: {platform}")
 
+def _epoch(timestamp):
+    """Unix time for an ISO timestamp, 0 when missing or unparseable"""
+    if not timestamp:
+        return 0.0
+    try:
+        return datetime.fromisoformat(str(timestamp)).timestamp()
+    except ValueError:
+        return 0.0
+
+def _newest_first(runs, limit):
+    """
+    Merge per-platform runs on their numeric "_ts" sort key, newest first, keeping
+    at most `limit` items and dropping the key from those returned.
+    Each platform already returns newest first, so the per-run sort is a linear pass
+    over one run and merging only touches the first `limit` items.
+    """
+    for run in runs:
+        run.sort(key=itemgetter("_ts"), reverse=True)
+    merged = list(islice(heapq.merge(*runs, key=itemgetter("_ts"), reverse=True), limit))
+    for item in merged:
+        del item["_ts"]
+    return merged
+
+def _message_status(is_fraud, risk_score):
+    """Display status for a message from its fraud analysis"""
+    return "Fraud" if is_fraud else ("Suspicious" if risk_score >= 40 else "Legitimate")
+
+async def _reddit_messages(limit: int):
+    reddit_posts = await asyncio.to_thread(reddit_monitor.get_recent_posts, limit)
+    return [
+        {
+            "platform": "reddit",
+            "message_id": post.id,
+            "source": post.subreddit,
+            "content": post.title,
+            "full_content": post.content,
+            "author": post.author,
+            "timestamp": post.created_iso,
+            "_ts": post.created_utc,
+            "url": post.url,
+            "is_fraud": post.is_fraud,
+            "risk_score": post.risk_score,
+            "alert_level": post.alert_level,
+            "analysis_summary": post.analysis_summary,
+            "status": _message_status(post.is_fraud, post.risk_score),
+            "engagement": {"score": post.score, "comments": post.num_comments}
+        }
+        for post in reddit_posts
+    ]
+
+async def _discord_messages(limit: int):
+    discord_messages = await asyncio.to_thread(discord_monitor.get_recent_messages, limit)
+    return [
+        {
+            "platform": "discord",
+            "message_id": msg.id,
+            "source": f"{msg.server_name}#{msg.channel_name}",
+            "content": msg.content,
+            "full_content": msg.content,
+            "author": msg.author,
+            "timestamp": msg.created_at.isoformat(),
+            "_ts": msg.created_at.timestamp(),
+            "url": msg.message_url,
+            "is_fraud": msg.is_fraud,
+            "risk_score": msg.risk_score,
+            "alert_level": msg.alert_level,
+            "analysis_summary": msg.analysis_summary,
+            "engagement": {}
+        }
+        for msg in discord_messages
+    ]
+
+async def _telegram_messages(limit: int):
+    messages = []
+    try:
+        if telegram_monitor:
+            telegram_messages = await asyncio.to_thread(telegram_monitor.get_recent_messages, limit)
+            for msg in telegram_messages:
+                messages.append({
+                    "platform": "telegram",
+                    "message_id": f"{msg.get('group_id', '')}-{msg.get('timestamp', '')}",
+                    "source": msg.get("group_name", "Unknown"),
+                    "content": msg.get("message_text", ""),
+                    "full_content": msg.get("message_text", ""),
+                    "author": msg.get("sender_username", "Unknown"),
+                    "timestamp": msg.get("timestamp", ""),
+                    "_ts": _epoch(msg.get("timestamp")),
+                    "url": f"https://t.me/{msg.get('group_name', '')}",
+                    "is_fraud": msg.get("is_fraud", False),
+                    "risk_score": msg.get("risk_score", 0),
+                    "alert_level": msg.get("alert_level", "low"),
+                    "analysis_summary": msg.get("analysis_summary", ""),
+                    "status": _message_status(msg.get("is_fraud", False), msg.get("risk_score", 0)),
+                    "engagement": {}
+                })
+    except Exception:
+        pass
+    return messages
+
 @router.get("/messages")
 async def get_recent_messages(limit: int = 100, platform: Optional[str] = None):
     """Get recent messages from all platforms or specific platform"""
-    all_messages = []
+    platform = platform.lower() if platform else None
+    fetches = []
+    if not platform or platform == "reddit":
+        fetches.append(_reddit_messages(limit))
+    if not platform or platform == "discord":
+        fetches.append(_discord_messages(limit))
+    if not platform or platform == "telegram":
+        fetches.append(_telegram_messages(limit))
     
-    if not platform or platform.lower() == "reddit":
-        reddit_posts = reddit_monitor.get_recent_posts(limit)
-        for post in reddit_posts:
-            # Determine status based on fraud analysis
-            if post.is_fraud:
-                status = "Fraud"
-            elif post.risk_score >= 40:
-                status = "Suspicious"
-            else:
-                status = "Legitimate"
-            
-            all_messages.append({
-                "platform": "reddit",
-                "message_id": post.id,
-                "source": post.subreddit,
-                "content": post.title,
-                "full_content": post.content,
-                "author": post.author,
-                "timestamp": datetime.fromtimestamp(post.created_utc).isoformat(),
-                "url": post.url,
-                "is_fraud": post.is_fraud,
-                "risk_score": post.risk_score,
-                "alert_level": post.alert_level,
-                "analysis_summary": post.analysis_summary,
-                "status": status,
-                "engagement": {"score": post.score, "comments": post.num_comments}
-            })
+    results = await asyncio.gather(*fetches)
+    messages = _newest_first(results, limit)
     
-    if not platform or platform.lower() == "discord":
-        discord_messages = discord_monitor.get_recent_messages(limit)
-        for msg in discord_messages:
-            all_messages.append({
-                "platform": "discord",
-                "message_id": msg.id,
-                "source": f"{msg.server_name}#{msg.channel_name}",
-                "content": msg.content,
-                "full_content": msg.content,
-                "author": msg.author,
-                "timestamp": msg.created_at.isoformat(),
-                "url": msg.message_url,
-                "is_fraud": msg.is_fraud,
-                "risk_score": msg.risk_score,
-                "alert_level": msg.alert_level,
-                "analysis_summary": msg.analysis_summary,
-                "engagement": {}
-            })
-    
-    if not platform or platform.lower() == "telegram":
-        try:
-            if telegram_monitor:
-                telegram_messages = telegram_monitor.get_recent_messages(limit)
-                for msg in telegram_messages:
-                    # Determine status based on fraud analysis (same logic as Reddit)
-                    if msg.get("is_fraud", False):
-                        status = "Fraud"
-                    elif msg.get("risk_score", 0) >= 40:
-                        status = "Suspicious"
-                    else:
-                        status = "Legitimate"
-                    
-                    all_messages.append({
-                        "platform": "telegram",
-                        "message_id": f"{msg.get('group_id', '')}-{msg.get('timestamp', '')}",
-                        "source": msg.get("group_name", "Unknown"),
-                        "content": msg.get("message_text", ""),
-                        "full_content": msg.get("message_text", ""),
-                        "author": msg.get("sender_username", "Unknown"),
-                        "timestamp": msg.get("timestamp", ""),
-                        "url": f"https://t.me/{msg.get('group_name', '')}",
-                        "is_fraud": msg.get("is_fraud", False),
-                        "risk_score": msg.get("risk_score", 0),
-                        "alert_level": msg.get("alert_level", "low"),
-                        "analysis_summary": msg.get("analysis_summary", ""),
-                        "status": status,
-                        "engagement": {}
-                    })
-        except Exception:
-            pass
-    
-    # Sort by timestamp (newest first)
-    all_messages.sort(key=lambda x: x["timestamp"], reverse=True)
-    
-    return {"messages": all_messages[:limit], "total_count": len(all_messages)}
+    # A Response is sent as is; a returned dict would first be walked by jsonable_encoder
+    return ORJSONResponse({"messages": messages, "total_count": sum(map(len, results))})
+
+async def _telegram_alerts(limit: int):
+    alerts = []
+    try:
+        if telegram_monitor:
+            telegram_alerts = await asyncio.to_thread(telegram_monitor.get_recent_alerts, limit)
+            # Convert telegram alerts to standard format
+            for alert in telegram_alerts:
+                alerts.append({
+                    "alert_id": alert.get("alert_id"),
+                    "platform": "telegram",
+                    "source": alert.get("group_name"),
+                    "content": alert.get("message_text"),
+                    "risk_score": alert.get("risk_score"),
+                    "alert_level": alert.get("alert_level"),
+                    "timestamp": alert.get("timestamp"),
+                    "_ts": _epoch(alert.get("timestamp")),
+                    "url": f"https://t.me/{alert.get('group_name', '')}",
+                    "analysis": alert.get("reason", "")
+                })
+    except Exception:
+        pass
+    return alerts
 
 @router.get("/alerts")
 async def get_fraud_alerts(limit: int = 50, platform: Optional[str] = None):
     """Get fraud alerts from all platforms or specific platform"""
-    all_alerts = []
-    
-    if not platform or platform.lower() == "reddit":
-        reddit_alerts = reddit_monitor.get_fraud_alerts(limit)
-        all_alerts.extend(reddit_alerts)
+    platform = platform.lower() if platform else None
+    fetches = []
+    if not platform or platform == "reddit":
+        fetches.append(asyncio.to_thread(reddit_monitor.get_fraud_alerts, limit))
+    if not platform or platform == "discord":
+        fetches.append(asyncio.to_thread(discord_monitor.get_fraud_alerts, limit))
+    if not platform or platform == "telegram":
+        fetches.append(_telegram_alerts(limit))
     
-    if not platform or platform.lower() == "discord":
-        discord_alerts = discord_monitor.get_fraud_alerts(limit)
-        all_alerts.extend(discord_alerts)
+    results = await asyncio.gather(*fetches)
+    # Reddit and Discord alerts only carry ISO timestamps
+    for platform_alerts in results:
+        for alert in platform_alerts:
+            if "_ts" not in alert:
+                alert["_ts"] = _epoch(alert.get("timestamp"))
+    alerts = _newest_first(results, limit)
     
-    if not platform or platform.lower() == "telegram":
-        try:
-            if telegram_monitor:
-                telegram_alerts = telegram_monitor.get_recent_alerts(limit)
-                # Convert telegram alerts to standard format
-                for alert in telegram_alerts:
-                    all_alerts.append({
-                        "alert_id": alert.get("alert_id"),
-                        "platform": "telegram",
-                        "source": alert.get("group_name"),
-                        "content": alert.get("message_text"),
-                        "risk_score": alert.get("risk_score"),
-                        "alert_level": alert.get("alert_level"),
-                        "timestamp": alert.get("timestamp"),
-                        "url": f"https://t.me/{alert.get('group_name', '')}",
-                        "analysis": alert.get("reason", "")
-                    })
-        except Exception:
-            pass
-    
-    # Sort by timestamp (newest first)
-    all_alerts.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-    
-    return {"alerts": all_alerts[:limit], "total_count": len(all_alerts)}
+    # A Response is sent as is; a returned dict would first be walked by jsonable_encoder
+    return ORJSONResponse({"alerts": alerts, "total_count": sum(map(len, results))})
+
+SUPPORTED_PLATFORMS_ENCODED = encode_json(SUPPORTED_PLATFORMS)
 
 @router.get("/platforms")
-async def get_supported_platforms():
+async def get_supported_platforms(request: Request):
     """Get list of supported social media platforms"""
-    return {
-        "platforms": [
-            {
-                "name": "telegram",
-                "display_name": "Telegram",
-                "description": "Monitor Telegram groups and channels",
-                "free": True,
-                "requires_setup": True,
-                "setup_requirements": ["TELEGRAM_API_ID", "TELEGRAM_API_HASH", "TELEGRAM_PHONE"]
-            },
-            {
-                "name": "reddit",
-                "display_name": "Reddit",
-                "description": "Monitor Reddit subreddits",
-                "free": True,
-                "requires_setup": True,
-                "setup_requirements": ["REDDIT_CLIENT_ID", "REDDIT_CLIENT_SECRET"]
-            },
-            {
-                "name": "discord",
-                "display_name": "Discord",
-                "description": "Monitor Discord servers and channels",
-                "free": True,
-                "requires_setup": True,
-                "setup_requirements": ["DISCORD_BOT_TOKEN"]
-            }
-        ]
-    }
+    return etag_response(request, SUPPORTED_PLATFORMS_ENCODED, max_age=PLATFORMS_MAX_AGE)
@@ -14,7 +14,13 @@ for quick verification of company mentions in text.
 
 import json
 import os
+import re
+import sys
+import bisect
+import functools
+import threading
 from pathlib import Path
+from types import MappingProxyType
 
 # Major Indian Companies (NSE/BSE)
 INDIAN_COMPANIES = {
@@ -90,55 +96,47 @@ ETFS_AND_INDICES = {
     'QQQ': {'type': 'ETF', 'tracks': 'NASDAQ100', 'risk_level': 'low'},
 }
 
+def _freeze(registry):
+    """Read-only view of a registry with interned symbol keys"""
+    return MappingProxyType({sys.intern(symbol): data for symbol, data in registry.items()})
+
+INDIAN_COMPANIES = _freeze(INDIAN_COMPANIES)
+US_COMPANIES = _freeze(US_COMPANIES)
+PENNY_STOCKS = _freeze(PENNY_STOCKS)
+ETFS_AND_INDICES = _freeze(ETFS_AND_INDICES)
+
+# symbol -> (market, data, fraud_risk) for verify_company_offline. Registries are listed
+# lowest precedence first so Indian, then US, then ETF entries win as in the original checks.
+_OFFLINE_VERIFICATIONS = {}
+for _market, _registry, _fraud_risk in (
+    ('Penny Stock', PENNY_STOCKS, 'HIGH'),
+    ('ETF/Index', ETFS_AND_INDICES, None),
+    ('US', US_COMPANIES, None),
+    ('Indian', INDIAN_COMPANIES, None),
+):
+    for _symbol, _data in _registry.items():
+        _OFFLINE_VERIFICATIONS[_symbol] = (_market, _data, _fraud_risk)
+
 def verify_company_offline(company_name):
     """
     Verify company existence using offline database
     No API calls required
     """
-    company = company_name.upper().strip()
-    
-    # Check Indian companies
-    if company in INDIAN_COMPANIES:
-        return {
-            'verified': True,
-            'market': 'Indian',
-            'data': INDIAN_COMPANIES[company],
-            'method': 'offline_database'
-        }
-    
-    # Check US companies
-    if company in US_COMPANIES:
-        return {
-            'verified': True,
-            'market': 'US',
-            'data': US_COMPANIES[company],
-            'method': 'offline_database'
-        }
+    entry = _OFFLINE_VERIFICATIONS.get(company_name.upper().strip())
     
-    # Check ETFs
-    if company in ETFS_AND_INDICES:
+    if entry is None:
         return {
-            'verified': True,
-            'market': 'ETF/Index',
-            'data': ETFS_AND_INDICES[company],
+            'verified': False,
+            'reason': 'Company not in database',
             'method': 'offline_database'
         }
     
-    # Check penny stocks
-    if company in PENNY_STOCKS:
-        return {
-            'verified': True,
-            'market': 'Penny Stock',
-            'data': PENNY_STOCKS[company],
-            'fraud_risk': 'HIGH',
-            'method': 'offline_database'
-        }
-    
-    return {
-        'verified': False,
-        'reason': 'Company not in database',
-        'method': 'offline_database'
-    }
+    market, data, fraud_risk = entry
+    result = {'verified': True, 'market': market, 'data': data}
+    if fraud_risk:
+        result['fraud_risk'] = fraud_risk
+    result['method'] = 'offline_database'
+    return result
 
 def get_fraud_risk_score(company_name):
     """
@@ -172,8 +170,72 @@ def get_fraud_risk_score(company_name):
 # --- Utility functions for company database management and lookup ---
 
 # Combine all companies into one dictionary for easy lookup
+# (companies saved at runtime are merged in at import, see the bottom of this module)
 ALL_COMPANIES = {**INDIAN_COMPANIES, **US_COMPANIES}
 
+# Runtime additions are appended one JSON object per line; the .json file is the
+# older whole-dict format and is still read if present
+DATA_DIR = Path(__file__).parent / "data"
+ADDITIONAL_COMPANIES_FILE = DATA_DIR / "additional_companies.json"
+ADDITIONAL_COMPANIES_LOG = DATA_DIR / "additional_companies.jsonl"
+_save_lock = threading.Lock()
+
+# Full-name lookup structures, built from ALL_COMPANIES by _build_name_indexes():
+# - _FULLNAME_TO_DATA: upper-cased full name -> company data (exact match)
+# - _FULLNAME_RE: alternation of all full names, finds a full name inside the query
+# - _FULLNAMES_JOINED/_FULLNAME_OFFSETS: every full name in one string, so "query is
+#   part of a full name" is a single substring search mapped back via bisect
+_FULLNAME_TO_DATA = {}
+_FULLNAME_RE = None
+_FULLNAMES_JOINED = ""
+_FULLNAME_OFFSETS = []
+_FULLNAME_DATA = []
+_FULLNAME_SEPARATOR = "\0"
+
+def _build_name_indexes():
+    global _FULLNAME_TO_DATA, _FULLNAME_RE, _FULLNAMES_JOINED, _FULLNAME_OFFSETS, _FULLNAME_DATA
+    
+    full_names = [(data.get('full_name', '').upper(), data) for data in ALL_COMPANIES.values()]
+    
+    _FULLNAME_TO_DATA = {}
+    for full_name, data in full_names:
+        _FULLNAME_TO_DATA.setdefault(full_name, data)
+    
+    # Longest names first so the most specific full name wins
+    _FULLNAME_RE = re.compile("|".join(
+        re.escape(full_name) for full_name in sorted(_FULLNAME_TO_DATA, key=len, reverse=True)
+    ))
+    
+    _FULLNAME_OFFSETS = []
+    _FULLNAME_DATA = []
+    offset = 0
+    for full_name, data in full_names:
+        _FULLNAME_OFFSETS.append(offset)
+        _FULLNAME_DATA.append(data)
+        offset += len(full_name) + len(_FULLNAME_SEPARATOR)
+    _FULLNAMES_JOINED = _FULLNAME_SEPARATOR.join(full_name for full_name, _ in full_names)
+    
+    is_legitimate_company.cache_clear()
+    get_company_info.cache_clear()
+
+def _find_by_full_name(name_upper):
+    """Company whose full name equals, contains, or is contained in name_upper"""
+    if name_upper in _FULLNAME_TO_DATA:
+        return _FULLNAME_TO_DATA[name_upper]
+    
+    # Name is a substring of a full name
+    position = _FULLNAMES_JOINED.find(name_upper)
+    if position != -1:
+        return _FULLNAME_DATA[bisect.bisect_right(_FULLNAME_OFFSETS, position) - 1]
+    
+    # A full name is a substring of the name
+    match = _FULLNAME_RE.search(name_upper)
+    if match:
+        return _FULLNAME_TO_DATA[match.group(0)]
+    
+    return None
+
+@functools.lru_cache(maxsize=4096)
 def is_legitimate_company(name):
     """
     Check if a company name or symbol is in our database of legitimate companies.
@@ -188,16 +250,10 @@ def is_legitimate_company(name):
     if name_upper in ALL_COMPANIES:
         return True
         
-    # Check full company names
-    for company_data in ALL_COMPANIES.values():
-        if company_data.get('full_name', '').upper() == name_upper:
-            return True
-        # Check if the name is a substring of the full name or vice versa
-        if name_upper in company_data.get('full_name', '').upper() or company_data.get('full_name', '').upper() in name_upper:
-            return True
-            
-    return False
+    # Check full company names, including substring matches either way
+    return _find_by_full_name(name_upper) is not None
 
+@functools.lru_cache(maxsize=4096)
 def get_company_info(name):
     """
     Get company information from our database.
@@ -213,73 +269,65 @@ def get_company_info(name):
         return ALL_COMPANIES[name_upper]
         
     # Check full company names
-    for symbol, company_data in ALL_COMPANIES.items():
-        full_name = company_data.get('full_name', '').upper()
-        if full_name == name_upper or name_upper in full_name or full_name in name_upper:
-            return company_data
-            
-    return None
+    return _find_by_full_name(name_upper)
 
 def save_company_to_database(symbol, company_info):
     """
     Save a new company to the database.
-    This will create a JSON file with additional companies that can be loaded at runtime.
+    The company is appended to data/additional_companies.jsonl and is available
+    to lookups immediately.
     """
     if not symbol:
         return False
         
     symbol_upper = symbol.strip().upper()
     
-    # Don't overwrite existing entries
-    if symbol_upper in ALL_COMPANIES:
-        return False
+    with _save_lock:
+        # Don't overwrite existing entries
+        if symbol_upper in ALL_COMPANIES:
+            return False
         
-    # Create a data directory if it doesn't exist
-    data_dir = Path(__file__).parent / "data"
-    data_dir.mkdir(exist_ok=True)
-    
-    # Path to additional companies JSON file
-    additional_file = data_dir / "additional_companies.json"
-    
-    # Load existing additional companies
-    additional_companies = {}
-    if additional_file.exists():
         try:
-            with open(additional_file, 'r') as f:
-                additional_companies = json.load(f)
+            DATA_DIR.mkdir(exist_ok=True)
+            with open(ADDITIONAL_COMPANIES_LOG, 'a') as f:
+                f.write(json.dumps({symbol_upper: company_info}) + "\n")
         except Exception as e:
-            print(f"Error loading additional companies file: {e}")
-    
-    # Add the new company
-    additional_companies[symbol_upper] = company_info
-    
-    # Save the updated file
-    try:
-        with open(additional_file, 'w') as f:
-            json.dump(additional_companies, f, indent=2)
-        return True
-    except Exception as e:
-        print(f"Error saving additional companies file: {e}")
-        return False
+            print(f"Error saving additional companies file: {e}")
+            return False
+        
+        ALL_COMPANIES[symbol_upper] = company_info
+        _build_name_indexes()
+    return True
 
 def load_additional_companies():
     """
-    Load additional companies from the JSON file.
+    Load additional companies saved at runtime.
     Returns a dictionary of additional companies.
     """
-    # Path to additional companies JSON file
-    data_dir = Path(__file__).parent / "data"
-    additional_file = data_dir / "additional_companies.json"
+    additional_companies = {}
     
-    # Load additional companies if the file exists
-    if additional_file.exists():
+    if ADDITIONAL_COMPANIES_FILE.exists():
         try:
-            with open(additional_file, 'r') as f:
-                return json.load(f)
+            with open(ADDITIONAL_COMPANIES_FILE, 'r') as f:
+                additional_companies.update(json.load(f))
         except Exception as e:
             print(f"Error loading additional companies file: {e}")
     
-    return {}
+    if ADDITIONAL_COMPANIES_LOG.exists():
+        try:
+            with open(ADDITIONAL_COMPANIES_LOG, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        additional_companies.update(json.loads(line))
+        except Exception as e:
+            print(f"Error loading additional companies file: {e}")
+    
+    return additional_companies
+
+# Merge runtime additions once at import, without shadowing the built-in entries
+for _symbol, _company in load_additional_companies().items():
+    ALL_COMPANIES.setdefault(_symbol, _company)
+_build_name_indexes()
 
 if __name__ == "__main__":
     # Test the offline verification
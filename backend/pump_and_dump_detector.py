@@ -1,10 +1,19 @@
+import os
+import re
+import math
 import time
+import threading
+import copy
+import requests
 import yfinance as yf
-from collections import defaultdict, deque, Counter
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict, deque, Counter, OrderedDict
 import numpy as np
 from datetime import datetime, timedelta
 import pandas as pd
 import logging
+from types import MappingProxyType
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -19,96 +28,249 @@ PRICE_VOLATILITY_WINDOW = 20         # 20 days for volatility calculation
 ANOMALY_THRESHOLD = 2.5              # Z-score threshold for anomalies
 SENTIMENT_HISTORY_DAYS = 7           # 7 days of sentiment tracking
 
+class MentionWindow:
+    """
+    Hourly mention counts for one symbol, with a running total of the window and
+    Welford running mean/M2 over the closed buckets (all but the current hour)
+    """
+    __slots__ = ("buckets", "total", "n", "mean", "m2")
+    
+    def __init__(self):
+        self.buckets = []  # (hour_bucket, count), oldest first; a list beats a deque at this size
+        self.total = 0
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def _close(self, count):
+        self.n += 1
+        delta = count - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (count - self.mean)
+    
+    def _evict(self, count):
+        if self.n == 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        delta = count - self.mean
+        self.n -= 1
+        self.mean -= delta / self.n
+        self.m2 = max(0.0, self.m2 - delta * (count - self.mean))
+    
+    def add(self, hour_bucket):
+        if self.buckets and self.buckets[-1][0] == hour_bucket:
+            self.buckets[-1] = (hour_bucket, self.buckets[-1][1] + 1)
+        else:
+            if self.buckets:
+                self._close(self.buckets[-1][1])
+            self.buckets.append((hour_bucket, 1))
+            if len(self.buckets) > MENTION_HISTORY_HOURS:
+                evicted = self.buckets.pop(0)[1]
+                self.total -= evicted
+                self._evict(evicted)
+        self.total += 1
+    
+    def z_score(self):
+        """Z-score of the current hour's count against the closed buckets, 0.0 without enough history"""
+        if self.n < 2:
+            return 0.0
+        std = math.sqrt(self.m2 / (self.n - 1))
+        if std < 1e-9:  # Constant counts, up to rounding left by evictions
+            return 0.0
+        return (self.buckets[-1][1] - self.mean) / std
+    
+    def latest(self):
+        """(last bucket count, average of the earlier buckets), or None with fewer than two buckets"""
+        n = len(self.buckets)
+        if n < 2:
+            return None
+        last = self.buckets[-1][1]
+        return last, (self.total - last) / (n - 1)
+
 # Data structures for tracking
-mention_history = defaultdict(lambda: deque(maxlen=MENTION_HISTORY_HOURS))  # symbol -> deque of (timestamp, count)
+mention_history = defaultdict(MentionWindow)  # symbol -> MentionWindow
 sentiment_history = defaultdict(lambda: deque(maxlen=SENTIMENT_HISTORY_DAYS*24))  # symbol -> deque of (timestamp, sentiment_score)
 price_history = {}                   # symbol -> DataFrame with OHLCV
 last_price_update = {}               # symbol -> timestamp
+price_expires_at = {}                # symbol -> time.time() after which the cached prices are stale
 known_pump_patterns = []             # Stored patterns for known pump schemes
+mention_versions = Counter()         # symbol -> number of mentions recorded, for cache keys
+
+# Symbols are analysed on worker threads: _history_lock guards the mention/sentiment
+# deques, _price_lock the price cache
+_history_lock = threading.Lock()
+_price_lock = threading.Lock()
+MAX_SCAN_WORKERS = 16
+
+# One pooled session for all Yahoo downloads so TLS connections are reused across symbols
+YF_SESSION = requests.Session()
+YF_SESSION.mount("https://", HTTPAdapter(pool_connections=MAX_SCAN_WORKERS, pool_maxsize=MAX_SCAN_WORKERS))
+# yf.download collects its results in module globals, so only one may run at a time;
+# per-symbol lookups on the scan workers use yf.Ticker instead
+_download_lock = threading.Lock()
+
+# Full analysis results, keyed on (symbol, price update time, mention version)
+ANALYSIS_CACHE_SIZE = 512
+_analysis_cache = OrderedDict()
+_analysis_lock = threading.Lock()
+
+# Company names and aliases -> yfinance symbol
+SYMBOL_MAP = MappingProxyType({
+    # US companies
+    "GOLDMAN SACHS": "GS",
+    "MORGAN STANLEY": "MS",
+    "NVIDIA": "NVDA",
+    "NVDA": "NVDA",
+    "AMD": "AMD",
+    "APPLE": "AAPL",
+    "MICROSOFT": "MSFT",
+    "GOOGLE": "GOOGL",
+    "ALPHABET": "GOOGL",
+    "AMAZON": "AMZN",
+    "META": "META",
+    "FACEBOOK": "META",
+    "TESLA": "TSLA",
+    "INTEL": "INTC",
+    # ETFs
+    "SMH": "SMH",
+    "SPDR": "SPY",
+    "QQQ": "QQQ",
+    # Indian companies
+    "TCS": "TCS",
+    "STATE BANK OF INDIA": "SBIN",
+    "SBI": "SBIN",
+    "HDFC BANK": "HDFCBANK",
+    "RELIANCE": "RELIANCE",
+    # Indices
+    "S&P 500": "^GSPC",
+    "S&P500": "^GSPC",
+    "DOW": "^DJI",
+    "NASDAQ": "^IXIC",
+    "NIFTY": "^NSEI",
+    "SENSEX": "^BSESN"
+})
+
+# Well-known indices, ETFs and major companies, which are less likely to be manipulated
+WELL_KNOWN_SYMBOLS = frozenset({
+    "^GSPC", "^DJI", "^IXIC", "^NSEI", "^BSESN",  # Indices
+    "SPY", "QQQ", "SMH", "VTI", "VOO", "DIA", "IWM", "EEM",  # ETFs
+    "NVDA", "AAPL", "MSFT", "GOOGL", "GOOG", "AMZN", "META", "TSLA",  # Major US companies
+    "TCS", "RELIANCE", "SBIN", "INFY", "HDFCBANK"  # Major Indian companies
+})
+WELL_KNOWN_KEYWORD_RE = re.compile(r"S&P|DOW|NASDAQ|NIFTY|SENSEX|INDEX|ETF")
+
+def is_well_known_symbol(symbol):
+    """Whether a symbol is a well-known index, ETF or major company"""
+    symbol_upper = symbol.upper()
+    return (symbol_upper in WELL_KNOWN_SYMBOLS or
+            symbol_upper.startswith("^") or
+            WELL_KNOWN_KEYWORD_RE.search(symbol_upper) is not None)
+
+# Exchange suffixes tried, in order, when batch-downloading price history
+PREFETCH_SUFFIXES = ("", ".NS", ".BO")
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Daily price history is also kept on disk as parquet so restarts skip Yahoo
+PRICE_CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache", "price_history")
+PRICE_CACHE_TTL = 86400  # 24 hours
 
 # Call this for each incoming message with the symbol and sentiment score
 def record_mention(symbol, sentiment_score=0.0):
     """Record a mention of a symbol with optional sentiment score"""
     now = int(time.time())
     hour_bucket = now // MENTION_WINDOW_SECONDS
-    dq = mention_history[symbol]
-    if dq and dq[-1][0] == hour_bucket:
-        dq[-1] = (hour_bucket, dq[-1][1] + 1)
-    else:
-        dq.append((hour_bucket, 1))
-    
-    # Record sentiment
-    sentiment_history[symbol].append((now, sentiment_score))
+    with _history_lock:
+        mention_history[symbol].add(hour_bucket)
+        
+        # Record sentiment
+        sentiment_history[symbol].append((now, sentiment_score))
+        mention_versions[symbol] += 1
     logger.debug(f"Recorded mention for {symbol} with sentiment {sentiment_score}")
 
-def get_price_history(symbol, force_update=False):
-    """Get historical price data with caching"""
-    # Expanded mapping for special cases
-    symbol_map = {
-        # US companies
-        "GOLDMAN SACHS": "GS",
-        "MORGAN STANLEY": "MS",
-        "NVIDIA": "NVDA",
-        "NVDA": "NVDA",
-        "AMD": "AMD",
-        "APPLE": "AAPL",
-        "MICROSOFT": "MSFT",
-        "GOOGLE": "GOOGL",
-        "ALPHABET": "GOOGL",
-        "AMAZON": "AMZN",
-        "META": "META",
-        "FACEBOOK": "META",
-        "TESLA": "TSLA",
-        "INTEL": "INTC",
-        # ETFs
-        "SMH": "SMH",
-        "SPDR": "SPY",
-        "QQQ": "QQQ",
-        # Indian companies
-        "TCS": "TCS",
-        "STATE BANK OF INDIA": "SBIN",
-        "SBI": "SBIN",
-        "HDFC BANK": "HDFCBANK",
-        "RELIANCE": "RELIANCE",
-        # Indices
-        "S&P 500": "^GSPC",
-        "S&P500": "^GSPC",
-        "DOW": "^DJI",
-        "NASDAQ": "^IXIC",
-        "NIFTY": "^NSEI",
-        "SENSEX": "^BSESN"
-    }
-    
-    # Use the mapping if available
-    actual_symbol = symbol_map.get(symbol.upper(), symbol)
+def _price_cache_path(symbol):
+    safe_symbol = re.sub(r"[^A-Za-z0-9._-]", "_", symbol)
+    return os.path.join(PRICE_CACHE_DIR, f"{safe_symbol}.parquet")
+
+def _normalize_prices(df):
+    """Flatten yfinance's (Price, Ticker) columns and cast OHLCV to float64, once per download"""
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.droplevel(list(range(1, df.columns.nlevels)), axis=1)
+    return df[PRICE_COLUMNS].astype('float64', copy=False)
+
+def _load_cached_prices(symbol):
+    """Load a symbol's price history from disk into memory if the file is still fresh"""
+    path = _price_cache_path(symbol)
+    try:
+        if os.path.exists(path):
+            mtime = os.path.getmtime(path)
+            if time.time() - mtime < PRICE_CACHE_TTL:
+                df = _normalize_prices(pd.read_parquet(path))
+                with _price_lock:
+                    price_history[symbol] = df
+                    last_price_update[symbol] = datetime.fromtimestamp(mtime)
+                    price_expires_at[symbol] = mtime + PRICE_CACHE_TTL
+                return df
+    except Exception as e:
+        logger.warning(f"Could not read price cache file {path}: {e}")
+    return None
+
+def _store_prices(symbol, df, now):
+    """Cache downloaded price history in memory and on disk, returning the normalized frame"""
+    df = _normalize_prices(df)
+    with _price_lock:
+        price_history[symbol] = df
+        last_price_update[symbol] = now
+        price_expires_at[symbol] = now.timestamp() + PRICE_CACHE_TTL
+    path = _price_cache_path(symbol)
+    try:
+        os.makedirs(PRICE_CACHE_DIR, exist_ok=True)
+        df.to_parquet(path)
+    except Exception as e:
+        logger.warning(f"Could not write price cache file {path}: {e}")
+    return df
+
+def _candidate_symbols(actual_symbol):
+    """yfinance symbols to try, in order, for a mapped symbol"""
+    # Indices only exist under their own symbol
+    if actual_symbol.startswith('^'):
+        return (actual_symbol,)
     
     # For US stocks, try direct symbol first, then exchanges
     # Include more formats to maximize chances of finding data
-    yf_symbols = [
+    return (
         actual_symbol,           # US stocks (NVDA)
         f"{actual_symbol}.NS",   # NSE (SBIN.NS)
         f"{actual_symbol}.BO",   # BSE (SBIN.BO)
         f"{actual_symbol}:US",   # Alternative US format
         f"{actual_symbol}-US"    # Another alternative format
-    ]
-    
-    # Special handling for indices
-    if actual_symbol.startswith('^'):
-        # Prioritize the index symbol
-        yf_symbols.insert(0, actual_symbol)
-    
+    )
+
+def _fresh_prices(symbol):
+    """In-memory price history for symbol, or None if missing or older than PRICE_CACHE_TTL"""
+    if time.time() < price_expires_at.get(symbol, 0.0):
+        return price_history.get(symbol)
+    return None
+
+def get_price_history(symbol, force_update=False):
+    """Get historical price data with caching"""
     # Check if we need to update (once per day per symbol)
+    if not force_update:
+        df = _fresh_prices(symbol)
+        if df is None:
+            df = _load_cached_prices(symbol)
+        if df is not None:
+            return df
+    
     now = datetime.now()
-    if symbol in price_history and not force_update:
-        last_update = last_price_update.get(symbol, datetime.min)
-        if (now - last_update).total_seconds() < 86400:  # 24 hours
-            return price_history[symbol]
     
-    # Try to fetch data from any exchange
-    for yf_symbol in yf_symbols:
+    # Try to fetch data from any exchange, using the mapping if available
+    actual_symbol = SYMBOL_MAP.get(symbol.upper(), symbol)
+    for yf_symbol in _candidate_symbols(actual_symbol):
         try:
             logger.info(f"Attempting to fetch data for {symbol} using {yf_symbol}")
-            df = yf.download(yf_symbol, period=f"{PRICE_HISTORY_DAYS}d", interval="1d", auto_adjust=True)
+            df = yf.Ticker(yf_symbol, session=YF_SESSION).history(
+                period=f"{PRICE_HISTORY_DAYS}d", interval="1d", auto_adjust=True, actions=False
+            )
             
             if not df.empty and len(df) > 2:  # Need at least 3 days of data
                 # Ensure the DataFrame has the right columns
@@ -119,8 +281,7 @@ def get_price_history(symbol, force_update=False):
                     logger.warning(f"Data for {yf_symbol} missing columns: {missing_columns}")
                     continue
                 
-                price_history[symbol] = df
-                last_price_update[symbol] = now
+                df = _store_prices(symbol, df, now)
                 logger.info(f"Updated price history for {symbol} from {yf_symbol}")
                 return df
             else:
@@ -132,51 +293,113 @@ def get_price_history(symbol, force_update=False):
     logger.warning(f"Could not fetch price data for {symbol}")
     return None
 
+def _ticker_frame(data, yf_symbol, batch_size):
+    """Pull one ticker's OHLCV out of a multi-ticker yf.download result"""
+    if isinstance(data.columns, pd.MultiIndex):
+        if yf_symbol not in data.columns.get_level_values(0):
+            return None
+        df = data[yf_symbol]
+    elif batch_size == 1:
+        df = data
+    else:
+        return None
+    
+    # Tickers from different exchanges share one date index, so drop the gaps
+    df = df.dropna(how='all')
+    if len(df) <= 2 or any(col not in df.columns for col in PRICE_COLUMNS):
+        return None
+    return df
+
+def prefetch_price_history(symbols, force_update=False):
+    """
+    Warm the price history cache with one multi-ticker download per exchange suffix,
+    so the get_price_history calls that follow are cache hits. Symbols that still
+    have no data fall back to get_price_history's per-symbol lookups.
+    """
+    now = datetime.now()
+    pending = {}  # symbol -> mapped yfinance symbol
+    for symbol in symbols:
+        if not force_update:
+            if _fresh_prices(symbol) is not None or _load_cached_prices(symbol) is not None:
+                continue
+        pending[symbol] = SYMBOL_MAP.get(symbol.upper(), symbol)
+    
+    for suffix in PREFETCH_SUFFIXES:
+        if not pending:
+            break
+        
+        tickers = defaultdict(list)  # yfinance ticker -> symbols that map to it
+        for symbol, actual_symbol in pending.items():
+            if suffix and actual_symbol.startswith('^'):
+                continue  # Indices only exist without an exchange suffix
+            tickers[f"{actual_symbol}{suffix}"].append(symbol)
+        if not tickers:
+            continue
+        
+        try:
+            logger.info(f"Batch fetching price data for {len(tickers)} tickers")
+            with _download_lock:
+                data = yf.download(" ".join(tickers), period=f"{PRICE_HISTORY_DAYS}d", interval="1d",
+                                   group_by='ticker', threads=True, auto_adjust=True, progress=False,
+                                   session=YF_SESSION)
+        except Exception as e:
+            logger.warning(f"Batch price download failed: {e}")
+            continue
+        
+        for yf_symbol, owners in tickers.items():
+            df = _ticker_frame(data, yf_symbol, len(tickers))
+            if df is None:
+                continue
+            for symbol in owners:
+                _store_prices(symbol, df, now)
+                del pending[symbol]
+
 # Analyze for spikes in mentions
 def detect_mention_spike(symbol, threshold=3.0):
     """Detect unusual spikes in social media mentions"""
-    dq = mention_history[symbol]
-    if len(dq) < 2:
+    with _history_lock:
+        window = mention_history.get(symbol)
+        stats = window.latest() if window is not None else None
+    if stats is None:
         return False, 0.0
-    counts = [c for _, c in dq]
-    avg = sum(counts[:-1]) / max(1, len(counts) - 1)
-    last = counts[-1]
+    last, avg = stats
     if avg == 0:
         return False, 0.0
     ratio = last / avg
     return ratio > threshold, ratio
 
+def mention_z_score(symbol):
+    """Z-score of the current hour's mentions against the rest of the window"""
+    with _history_lock:
+        window = mention_history.get(symbol)
+        return window.z_score() if window is not None else 0.0
+
 def analyze_sentiment_shift(symbol):
     """Detect shifts in sentiment (negative to positive or vice versa)"""
-    dq = sentiment_history[symbol]
-    if len(dq) < 10:  # Need at least 10 data points
+    with _history_lock:
+        dq = sentiment_history.get(symbol, ())
+        sentiments = np.fromiter((s for _, s in dq), dtype=np.float64, count=len(dq))
+    if sentiments.size < 10:  # Need at least 10 data points
         return False, 0.0
     
     # Compute average sentiment for first and second half
-    timestamps = [t for t, _ in dq]
-    sentiments = [s for _, s in dq]
-    half_point = len(sentiments) // 2
-    
-    first_half_avg = sum(sentiments[:half_point]) / half_point if half_point else 0
-    second_half_avg = sum(sentiments[half_point:]) / (len(sentiments) - half_point) if len(sentiments) > half_point else 0
+    half_point = sentiments.size // 2
+    first_half_avg = sentiments[:half_point].mean()
+    second_half_avg = sentiments[half_point:].mean()
     
     # Check for significant shift
-    shift = second_half_avg - first_half_avg
+    shift = float(second_half_avg - first_half_avg)
     significant_shift = abs(shift) > 0.3  # Threshold for significant shift
     
     return significant_shift, shift
 
-def detect_price_volume_spike(symbol, lookback_days=5, threshold=2.0):
-    """Detect unusual price and volume patterns"""
-    # List of well-known ETFs, indices and major companies that are less likely to be manipulated
-    well_known_entities = [
-        'SPY', 'QQQ', 'VTI', 'VOO', 'SMH', 'DIA', 'IWM', 'EEM',  # ETFs
-        '^GSPC', '^DJI', '^IXIC', '^NSEI', '^BSESN',  # Indices
-        'MSFT', 'AAPL', 'GOOGL', 'GOOG', 'AMZN', 'NVDA', 'META', 'TSLA'  # Major companies
-    ]
-    
+def detect_price_volume_spike(symbol, lookback_days=5, threshold=2.0, pattern_match=None):
+    """
+    Detect unusual price and volume patterns.
+    pattern_match is a precomputed detect_pump_patterns result for the symbol, if any.
+    """
     # Check if this is a well-known entity (for logging)
-    is_well_known = symbol in well_known_entities or any(symbol.startswith(item) for item in well_known_entities)
+    is_well_known = is_well_known_symbol(symbol)
     if is_well_known:
         logger.info(f"{symbol} identified as well-known index/ETF/major company - reducing risk profile")
     
@@ -199,102 +422,53 @@ def detect_price_volume_spike(symbol, lookback_days=5, threshold=2.0):
     recent_df = df.tail(lookback_days)
     
     # Volume analysis (if volume data is available)
+    # get_price_history normalizes to flat float64 columns, so these are plain scalars
     if has_volume:
-        try:
-            # Use proper scalar values for calculations to avoid Series operations
-            if len(df) > lookback_days:
-                avg_vol = df['Volume'].iloc[:-lookback_days].mean()
-            else:
-                avg_vol = df['Volume'].mean()
-            
-            # Fix for the FutureWarning - use .iloc[0] instead of float()
-            last_vol = df['Volume'].iloc[-1]
-            if hasattr(last_vol, 'iloc'):  # Check if it's a Series
-                last_vol = last_vol.iloc[0]
-            else:
-                last_vol = float(last_vol)
-                
-            # Same for avg_vol
-            if hasattr(avg_vol, 'iloc'):  # Check if it's a Series
-                avg_vol = avg_vol.iloc[0]
-            else:
-                avg_vol = float(avg_vol)
-                
-            vol_ratio = last_vol / max(1.0, avg_vol)  # Ensure we're working with scalars
-            volume_spike = vol_ratio > threshold
-        except Exception as e:
-            logger.error(f"Error in volume analysis for {symbol}: {e}")
-            volume_spike = False
-            vol_ratio = 0.0
+        if len(df) > lookback_days:
+            avg_vol = df['Volume'].iloc[:-lookback_days].mean()
+        else:
+            avg_vol = df['Volume'].mean()
+        vol_ratio = float(df['Volume'].iloc[-1]) / max(1.0, avg_vol)
+        volume_spike = vol_ratio > threshold
     else:
         # No volume data
         volume_spike = False
         vol_ratio = 0.0
     
-    # Price analysis - multiple methods
-    try:
-        # 1. Recent price change vs historical volatility
-        # Handle potential broadcasting errors by ensuring we have proper arrays
-        try:
-            prices = df['Close'].values
-        except Exception:
-            # If we can't get values directly, try to get as list first
-            try:
-                prices = df['Close'].tolist()
-            except Exception:
-                # As a last resort, handle one value at a time
-                prices = [float(df['Close'].iloc[i]) for i in range(len(df))]
-                
-        # Handle empty price data
-        if len(prices) < 2:
-            return {
-                'price_spike': False, 
-                'volume_spike': volume_spike,
-                'price_change_pct': 0.0,
-                'volume_ratio': vol_ratio,
-                'price_z_score': 0.0
-            }
-        
-        # Safe calculation of returns with proper shape handling
-        try:
-            returns = np.diff(prices) / prices[:-1]
-        except Exception as e:
-            logger.warning(f"Error calculating returns for {symbol}: {e} - using safer method")
-            returns = [(prices[i+1]/prices[i])-1 for i in range(len(prices)-1)]
-        
-        # Calculate recent return (handle case with limited data)
-        lookback_index = min(5, len(prices)-1)
-        if lookback_index > 0:
-            recent_return = (prices[-1] / prices[-lookback_index]) - 1
-        else:
-            recent_return = 0.0
-            
-        # Calculate historical volatility (with proper handling of window size)
-        window_size = min(PRICE_VOLATILITY_WINDOW, len(returns))
-        if window_size > 0:
-            volatility = np.std(returns[-window_size:])
-            mean_return = np.mean(returns[-window_size:])
-        else:
-            volatility = 0
-            mean_return = 0
-        
-        # Z-score of recent return
-        if volatility > 0:
-            z_score = (recent_return - mean_return) / volatility
-        else:
-            z_score = 0
-            
-        price_spike = abs(z_score) > ANOMALY_THRESHOLD
-        
-        # 2. Detect classic pump patterns (sharp rise followed by distribution)
-        pattern_match = detect_pump_pattern(recent_df)
-        
-    except Exception as e:
-        logger.error(f"Error in price analysis for {symbol}: {e}")
-        price_spike = False
+    # Price analysis - multiple methods. The frame is non-empty and float64 here, so
+    # unexpected failures propagate to analyze_pump_and_dump's handler
+    # 1. Recent price change vs historical volatility
+    prices = df['Close'].to_numpy()
+    returns = np.diff(prices) / prices[:-1]
+    
+    # Calculate recent return (at least two prices, so the lookback is >= 1)
+    lookback_index = min(5, prices.size - 1)
+    recent_return = (prices[-1] / prices[-lookback_index]) - 1
+    
+    # Calculate historical volatility over the trailing window
+    tail = returns[-min(PRICE_VOLATILITY_WINDOW, returns.size):]
+    volatility = tail.std()
+    mean_return = tail.mean()
+    
+    # Z-score of recent return
+    if volatility > 0:
+        z_score = (recent_return - mean_return) / volatility
+    else:
         z_score = 0
-        recent_return = 0
-        pattern_match = False
+    
+    price_spike = abs(z_score) > ANOMALY_THRESHOLD
+    
+    # 2. Detect classic pump patterns (sharp rise followed by distribution),
+    # reusing the returns above; the first recent day has no prior day in the window
+    if pattern_match is None:
+        n_recent = len(recent_df)
+        recent_returns = np.concatenate(([np.nan], returns[-(n_recent - 1):])) if n_recent > 1 else None
+        recent_vol_change = None
+        if has_volume and n_recent > 1:
+            volumes = recent_df['Volume'].to_numpy()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                recent_vol_change = np.concatenate(([np.nan], np.diff(volumes) / volumes[:-1]))
+        pattern_match = detect_pump_pattern(recent_df, recent_returns, recent_vol_change)
     
     return {
         'price_spike': price_spike, 
@@ -305,77 +479,132 @@ def detect_price_volume_spike(symbol, lookback_days=5, threshold=2.0):
         'pattern_match': pattern_match
     }
 
-def detect_pump_pattern(df):
-    """Detect classic pump and dump chart patterns"""
+def _spike_then_drop_numpy(returns, vol_change, use_volume):
+    """
+    True if some day spikes (return > 5% with volume up > 50%, or return > 8% when
+    volume is not used) and the price falls on one of the next two days.
+    """
+    if use_volume:
+        spike_days = (returns > 0.05) & (vol_change > 0.5)
+    else:
+        spike_days = returns > 0.08  # Higher threshold for price-only signals
+    for pos in np.flatnonzero(spike_days):
+        if pos < len(returns) - 2 and (returns[pos+1:pos+3] < 0).any():
+            return True
+    return False
+
+try:
+    from numba import njit
+
+    @njit(cache=True)
+    def spike_then_drop(returns, vol_change, use_volume):
+        n = returns.shape[0]
+        for i in range(n - 2):
+            if use_volume:
+                spike = returns[i] > 0.05 and vol_change[i] > 0.5
+            else:
+                spike = returns[i] > 0.08
+            if spike and (returns[i + 1] < 0 or returns[i + 2] < 0):
+                return True
+        return False
+except ImportError:
+    spike_then_drop = _spike_then_drop_numpy
+
+def detect_pump_pattern(df, returns=None, vol_change=None):
+    """
+    Detect classic pump and dump chart patterns.
+    returns/vol_change are optional per-row changes aligned with df; when given
+    they are used instead of recomputing pct_change.
+    """
     if len(df) < 5:
         return False
     
-    # Pattern 1: Sharp rise in price with increasing volume, followed by price decline
-    try:
-        # Calculate daily returns and volume changes
-        df = df.copy()
-        
-        # Check if Volume column exists
-        has_volume = 'Volume' in df.columns
-        
-        # Calculate returns safely
-        try:
-            df['return'] = df['Close'].pct_change()
-        except Exception as e:
-            logger.warning(f"Error calculating returns: {e}")
-            return False
-        
-        # Calculate volume changes if volume data exists
-        if has_volume:
-            try:
-                df['vol_change'] = df['Volume'].pct_change()
-                # Look for days with both price and volume spikes
-                spike_days = (df['return'] > 0.05) & (df['vol_change'] > 0.5)
-            except Exception as e:
-                logger.warning(f"Error calculating volume changes: {e}")
-                # Use only price spikes if volume calculation fails
-                spike_days = df['return'] > 0.08  # Higher threshold for price-only signals
-        else:
-            # Use only price spikes if no volume data
-            spike_days = df['return'] > 0.08  # Higher threshold for price-only signals
-        
-        if spike_days.sum() >= 1:
-            spike_idx = df.index[spike_days].tolist()
-            
-            # For each spike day, check if there's a price decline afterward
-            for idx in spike_idx:
-                pos = df.index.get_loc(idx)
-                if pos < len(df) - 2:  # Ensure we have data after the spike
-                    post_spike = df.iloc[pos+1:pos+3]
-                    if (post_spike['return'] < 0).any():
-                        return True
+    # Pattern 1: Sharp rise in price with increasing volume, followed by price decline.
+    # Works on numpy arrays of the changes, leaving df itself untouched
+    if returns is None:
+        returns = df['Close'].pct_change(fill_method=None).to_numpy()
+    daily_returns = np.ascontiguousarray(returns, dtype=np.float64)
+    
+    # Use only price spikes when there is no volume data
+    use_volume = 'Volume' in df.columns
+    if use_volume:
+        if vol_change is None:
+            vol_change = df['Volume'].pct_change(fill_method=None).to_numpy()
+        volume_changes = np.ascontiguousarray(vol_change, dtype=np.float64)
+    else:
+        volume_changes = daily_returns  # Ignored unless use_volume
     
-    except Exception as e:
-        logger.error(f"Error in pump pattern detection: {e}")
-        
-    return False
+    return bool(spike_then_drop(daily_returns, volume_changes, use_volume))
+
+def _cached_analysis(symbol, version):
+    """Cached result for symbol if its price data is still fresh and no mentions arrived since"""
+    if _fresh_prices(symbol) is None:
+        return None
+    with _price_lock:
+        updated = last_price_update.get(symbol)
+    key = (symbol, updated, version)
+    with _analysis_lock:
+        result = _analysis_cache.get(key)
+        if result is None:
+            return None
+        _analysis_cache.move_to_end(key)
+    return copy.deepcopy(result)
+
+def _store_analysis(symbol, version, result):
+    with _price_lock:
+        updated = last_price_update.get(symbol)
+    if updated is None:
+        return
+    with _analysis_lock:
+        _analysis_cache[(symbol, updated, version)] = copy.deepcopy(result)
+        while len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+
+def detect_pump_patterns(symbols, lookback_days=5):
+    """
+    Vectorized detect_pump_pattern over the cached price history of many symbols.
+    Stacks each symbol's recent rows into one (symbol, date) panel and applies the
+    spike-then-drop rule once. Returns {symbol: bool} for the symbols with enough data.
+    """
+    with _price_lock:
+        frames = {symbol: price_history[symbol] for symbol in symbols if symbol in price_history}
+    recent = {symbol: df.tail(lookback_days)[['Close', 'Volume']] for symbol, df in frames.items()}
+    recent = {symbol: df for symbol, df in recent.items() if len(df) >= 5}
+    if not recent:
+        return {}
+    
+    panel = pd.concat(recent, names=['symbol', 'date'])
+    by_symbol = panel.groupby(level=0, sort=False)
+    ret = by_symbol['Close'].pct_change(fill_method=None)
+    vchg = by_symbol['Volume'].pct_change(fill_method=None)
+    
+    # A spike day (return > 5% on volume up > 50%) with a drop on one of the next two days
+    by_return = ret.groupby(level=0, sort=False)
+    next1 = by_return.shift(-1)
+    next2 = by_return.shift(-2)
+    spike = (ret > 0.05) & (vchg > 0.5) & next2.notna() & ((next1 < 0) | (next2 < 0))
+    flags = spike.groupby(level=0, sort=False).any()
+    return {symbol: bool(flag) for symbol, flag in flags.items()}
 
 # Main pump-and-dump detection function
-def analyze_pump_and_dump(symbol):
-    """Comprehensive analysis for potential pump and dump schemes"""
+def analyze_pump_and_dump(symbol, pattern_match=None):
+    """
+    Comprehensive analysis for potential pump and dump schemes.
+    pattern_match is a precomputed detect_pump_patterns result for the symbol, if any.
+    """
+    with _history_lock:
+        version = mention_versions[symbol]
+    cached = _cached_analysis(symbol, version)
+    if cached is not None:
+        logger.debug(f"Using cached pump-and-dump analysis for {symbol}")
+        return cached
+    
     logger.info(f"Starting pump-and-dump analysis for {symbol}")
     
     # Special cases for well-known entities (indices, ETFs, major companies)
-    well_known_list = [
-        "^GSPC", "^DJI", "^IXIC", "^NSEI", "^BSESN",  # Indices
-        "SPY", "QQQ", "SMH", "VTI", "VOO", "DIA", "IWM", "EEM",  # ETFs
-        "NVDA", "AAPL", "MSFT", "GOOGL", "GOOG", "AMZN", "META", "TSLA",  # Major US companies
-        "TCS", "RELIANCE", "SBIN", "INFY", "HDFCBANK"  # Major Indian companies
-    ]
-    
-    # Enhanced matching for well-known entities
-    if (symbol.upper() in [x.upper() for x in well_known_list] or 
-        symbol.upper().startswith("^") or 
-        any(item.upper() in symbol.upper() for item in ["S&P", "DOW", "NASDAQ", "NIFTY", "SENSEX", "INDEX", "ETF"])):
+    is_well_known = is_well_known_symbol(symbol)
+    if is_well_known:
         logger.info(f"{symbol} identified as well-known index/ETF/major company - reducing risk profile")
-        is_well_known = True
-    else:
-        is_well_known = False
     
     # First check for symbol validity
     try:
@@ -413,10 +642,11 @@ def analyze_pump_and_dump(symbol):
         # Check for mention patterns
         try:
             mention_spike, mention_ratio = detect_mention_spike(symbol)
-            logger.debug(f"{symbol} mention spike: {mention_spike}, ratio: {mention_ratio}")
+            mention_z = mention_z_score(symbol)
+            logger.debug(f"{symbol} mention spike: {mention_spike}, ratio: {mention_ratio}, z-score: {mention_z:.2f}")
         except Exception as e:
             logger.error(f"Error in detect_mention_spike for {symbol}: {e}")
-            mention_spike, mention_ratio = False, 0
+            mention_spike, mention_ratio, mention_z = False, 0, 0.0
             
         try:
             sentiment_shift, sentiment_delta = analyze_sentiment_shift(symbol)
@@ -426,7 +656,7 @@ def analyze_pump_and_dump(symbol):
             sentiment_shift, sentiment_delta = False, 0
             
         try:
-            price_vol_analysis = detect_price_volume_spike(symbol)
+            price_vol_analysis = detect_price_volume_spike(symbol, pattern_match=pattern_match)
             logger.debug(f"{symbol} price-volume analysis: {price_vol_analysis}")
         except Exception as e:
             logger.error(f"Error in detect_price_volume_spike for {symbol}: {e}")
@@ -486,12 +716,8 @@ def analyze_pump_and_dump(symbol):
     # Determine if this should be flagged as suspicious
     flagged = risk_score >= 50
     
-    try:
-        # Get current price data
-        current_price = price_data['Close'].iloc[-1] if not price_data.empty and len(price_data) > 0 else 0
-    except Exception as e:
-        current_price = 0
-        print(f"Error getting current price for {symbol}: {e}")
+    # price_data was checked to have at least three rows above
+    current_price = float(price_data['Close'].iloc[-1])
     
     # Create a simplified response that's compatible with our UI
     result = {
@@ -499,6 +725,7 @@ def analyze_pump_and_dump(symbol):
         "valid_symbol": True,
         "mention_spike": mention_spike,
         "mention_ratio": mention_ratio,
+        "mention_z_score": mention_z,
         "sentiment_shift": sentiment_shift,
         "sentiment_delta": sentiment_delta,
         "price_spike": price_vol_analysis.get('price_spike', False),
@@ -513,31 +740,60 @@ def analyze_pump_and_dump(symbol):
         "analysis_timestamp": datetime.now().isoformat(),
     }
     
+    _store_analysis(symbol, version, result)
     return result
 
+def _analyze_all(symbols, patterns=None):
+    """
+    Run analyze_pump_and_dump over symbols on a thread pool, keeping input order.
+    patterns is an optional detect_pump_patterns result.
+    """
+    symbols = list(symbols)
+    if not symbols:
+        return []
+    patterns = patterns or {}
+    with ThreadPoolExecutor(max_workers=min(MAX_SCAN_WORKERS, len(symbols)), thread_name_prefix="pump-scan") as executor:
+        return list(executor.map(analyze_pump_and_dump, symbols, [patterns.get(symbol) for symbol in symbols]))
+
 def scan_multiple_symbols(symbols):
     """Run analysis on multiple symbols and return high-risk ones"""
-    results = []
-    for symbol in symbols:
-        result = analyze_pump_and_dump(symbol)
-        if result.get("flagged", False):
-            results.append(result)
-    return results
+    prefetch_price_history(symbols)
+    patterns = detect_pump_patterns(symbols)
+    
+    return [result for result in _analyze_all(symbols, patterns) if result.get("flagged", False)]
+
+# Risk score a symbol must exceed to raise an alert
+ALERT_RISK_SCORE = 70
+# Most the price/volume/pattern signals can add to the risk score (25 + 20 + 20)
+PRICE_SIGNALS_MAX_SCORE = 65
+
+def _max_risk_score(symbol):
+    """Upper bound on analyze_pump_and_dump's risk score using only the in-memory mention signals"""
+    mention_spike, _ = detect_mention_spike(symbol)
+    sentiment_shift, sentiment_delta = analyze_sentiment_shift(symbol)
+    score = PRICE_SIGNALS_MAX_SCORE
+    if mention_spike: score += 25
+    if sentiment_shift and sentiment_delta > 0: score += 10
+    if is_well_known_symbol(symbol): score -= 30
+    return score
 
 def alert_high_risk_stocks():
     """Generate alerts for high-risk stocks being mentioned"""
     # Get symbols that have been mentioned recently
-    active_symbols = list(mention_history.keys())
+    with _history_lock:
+        active_symbols = list(mention_history.keys())
     
-    if not active_symbols:
+    # Skip the price download for symbols whose social signals can't push them over the threshold
+    candidates = [symbol for symbol in active_symbols if _max_risk_score(symbol) > ALERT_RISK_SCORE]
+    if not candidates:
         return []
     
     # Analyze them for pump and dump patterns
-    alerts = []
-    for symbol in active_symbols:
-        result = analyze_pump_and_dump(symbol)
-        if result.get("flagged", False) and result.get("risk_score", 0) > 70:
-            alerts.append(result)
+    prefetch_price_history(candidates)
+    alerts = [
+        result for result in _analyze_all(candidates)
+        if result.get("flagged", False) and result.get("risk_score", 0) > ALERT_RISK_SCORE
+    ]
     
     # Log alerts
     for alert in alerts:
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+One-off script to export the DeepFace Facenet model to ONNX and quantize it to int8.
+
+media_verification.py uses models/facenet_int8.onnx automatically when it exists and
+onnxruntime is installed. Needs tf2onnx in addition to the backend requirements.
+"""
+
+import os
+import tensorflow as tf
+import tf2onnx
+from deepface import DeepFace
+from onnxruntime.quantization import quantize_dynamic, QuantType
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+FP32_PATH = os.path.join(MODELS_DIR, "facenet.onnx")
+INT8_PATH = os.path.join(MODELS_DIR, "facenet_int8.onnx")
+
+def export_facenet_int8():
+    """Convert the Keras Facenet model to ONNX, then apply dynamic int8 weight quantization"""
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    
+    model = DeepFace.build_model("Facenet")
+    # Newer DeepFace releases wrap the Keras model
+    model = getattr(model, "model", model)
+    
+    input_signature = (tf.TensorSpec((None, 160, 160, 3), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(model, input_signature=input_signature, output_path=FP32_PATH)
+    print(f"Exported FP32 model to {FP32_PATH}")
+    
+    quantize_dynamic(FP32_PATH, INT8_PATH, weight_type=QuantType.QInt8)
+    print(f"Quantized int8 model written to {INT8_PATH}")
+
+if __name__ == "__main__":
+    export_facenet_int8()
@@ -4,11 +4,29 @@ import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from collections import namedtuple
 import json
 import re
+import time
+import heapq
+import threading
+from itertools import takewhile
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import re2  # google-re2: linear-time matching, no backtracking on adversarial input
+except ImportError:
+    re2 = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,6 +34,17 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env if present
 load_dotenv()
 
+# Seconds a get_recent_posts result is reused, so polling endpoints don't refetch from Reddit
+RECENT_POSTS_TTL = 90
+# Bounds on the fetch caches: limits come from clients, and subreddit sets change over time
+HOT_CACHE_SIZE = 8
+POSTS_CACHE_SIZE = 64
+# Subreddits are fetched in parallel, since each fetch is a blocking Reddit round-trip
+MAX_FETCH_WORKERS = 8
+# Posts whose title and body hold nothing but links are not scanned
+URL_RE = re.compile(r"https?://\S+")
+LINK_ONLY_VERDICT = (False, 0, "low", "Link-only post, no text to analyze")
+
 @dataclass
 class RedditPost:
     id: str
@@ -31,11 +60,47 @@ class RedditPost:
     risk_score: int = 0
     alert_level: str = "low"
     analysis_summary: str = ""
+    created_iso: str = ""  # created_utc formatted once at ingestion
+
+# Cached and analyzed posts are kept as plain rows with RedditPost's fields; a RedditPost
+# is only built for the posts get_recent_posts hands out
+PostRow = namedtuple("PostRow", [field.name for field in fields(RedditPost)])
+
+@dataclass
+class PostBatch:
+    """Posts fetched for one limit, plus their numeric fields as arrays for the stats"""
+    posts: List[PostRow]
+    created_utc: np.ndarray
+    risk_score: np.ndarray
+    is_fraud: np.ndarray
+    
+    @classmethod
+    def from_posts(cls, posts: List[PostRow]) -> "PostBatch":
+        n = len(posts)
+        return cls(
+            posts=posts,
+            created_utc=np.fromiter((post.created_utc for post in posts), dtype=np.float64, count=n),
+            risk_score=np.fromiter((post.risk_score for post in posts), dtype=np.int16, count=n),
+            is_fraud=np.fromiter((post.is_fraud for post in posts), dtype=bool, count=n)
+        )
+
+EMPTY_BATCH = PostBatch.from_posts([])
 
 class RedditMonitor:
     def __init__(self):
         self.reddit = None
         self.monitored_subreddits = set()
+        # PRAW instances aren't thread-safe (one session, one rate limiter), so each fetch
+        # worker builds its own from the credentials initialize() stored
+        self._reddit_config = None
+        self._thread_state = threading.local()
+        self._fetch_executor = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS, thread_name_prefix="reddit-fetch")
+        # Held while checking and filling the caches, so concurrent requests share one fetch
+        self._fetch_lock = threading.Lock()
+        # frozenset of subreddits -> (fetched_at, depth, {subreddit: [(hot rank, analyzed post)]})
+        self._hot_cache = TTLCache(maxsize=HOT_CACHE_SIZE, ttl=RECENT_POSTS_TTL)
+        # (frozenset of subreddits, posts per subreddit) -> (fetched_at, PostBatch)
+        self._posts_cache = TTLCache(maxsize=POSTS_CACHE_SIZE, ttl=RECENT_POSTS_TTL)
         self.fraud_keywords = [
             "guaranteed returns", "risk-free", "double your money", "get rich quick",
             "secret strategy", "insider tip", "100% profit", "no loss", "sure shot",
@@ -53,6 +118,58 @@ class RedditMonitor:
             r"contact.*\d+",  # Contact numbers
         ]
         
+        # Literal terms behind the two extra risk factors in analyze_fraud_risk
+        self.guarantee_words = ["guaranteed", "risk-free", "sure shot"]
+        self.contact_words = ["whatsapp", "telegram", "dm me", "contact"]
+        
+        # All literal terms are found in one case-insensitive scan. The alternation is
+        # longest-first inside a lookahead, so it reports the longest term at every start
+        # position; every other term starting there is a prefix of it, so each reported
+        # term expands to all the terms it contains
+        literals = sorted(set(self.fraud_keywords + self.guarantee_words + self.contact_words), key=len, reverse=True)
+        self._contained_literals = {
+            literal: [other for other in literals if other in literal] for literal in literals
+        }
+        self._literal_re = re.compile(
+            "(?=(" + "|".join(map(re.escape, literals)) + "))", re.IGNORECASE
+        )
+        # The regex patterns get a second scan; each one starts with a distinct character,
+        # so the lookahead union still finds every pattern, greedy .* included. RE2 has no
+        # lookaheads, so with google-re2 installed each pattern is searched on its own, in
+        # guaranteed linear time
+        self._pattern_re2 = None
+        if re2 is not None:
+            self._pattern_re2 = [re2.compile("(?i)" + pattern) for pattern in self.high_risk_patterns]
+        self._pattern_re = re.compile(
+            "(?=" + "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(self.high_risk_patterns)) + ")",
+            re.IGNORECASE
+        )
+        # When pyahocorasick is installed an Aho-Corasick automaton finds every literal
+        # occurrence, overlaps included, in one linear pass over the lowercased text
+        self._literal_automaton = None
+        if ahocorasick is not None:
+            self._literal_automaton = ahocorasick.Automaton()
+            for literal in literals:
+                self._literal_automaton.add_word(literal, literal)
+            self._literal_automaton.make_automaton()
+        
+        # Scoring table, in summary order: each keyword, each pattern, then the guarantee and
+        # contact factors. A post's scan fills one row of hits; scores for a whole batch are
+        # then a single matrix-vector product. The guarantee and contact factors are read off
+        # the same literal scan as the keywords, and each adds its weight once per post
+        n_keywords = len(self.fraud_keywords)
+        self._pattern_offset = n_keywords
+        self._guarantee_index = n_keywords + len(self.high_risk_patterns)
+        self._contact_index = self._guarantee_index + 1
+        self._rule_weights = np.array(
+            [15] * n_keywords + [20] * len(self.high_risk_patterns) + [25, 20], dtype=np.int32
+        )
+        self._rule_labels = (
+            [f"Suspicious keyword: '{keyword}'" for keyword in self.fraud_keywords]
+            + [None] * len(self.high_risk_patterns)  # Labelled with the matched text
+            + ["Unrealistic guarantees detected", "Suspicious contact methods"]
+        )
+        
     def initialize(self):
         """Initialize Reddit API connection"""
         try:
@@ -64,11 +181,12 @@ class RedditMonitor:
                 logger.error("Reddit API credentials not found in environment variables")
                 return False
                 
-            self.reddit = praw.Reddit(
-                client_id=client_id,
-                client_secret=client_secret,
-                user_agent=user_agent
-            )
+            self._reddit_config = {
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "user_agent": user_agent
+            }
+            self.reddit = praw.Reddit(**self._reddit_config)
             # Ensure read-only mode for app-only credentials
             self.reddit.read_only = True
             
@@ -127,101 +245,213 @@ class RedditMonitor:
             for name in self.monitored_subreddits
         ]
     
-    def analyze_fraud_risk(self, title: str, content: str) -> tuple[bool, int, str, str]:
-        """Analyze post for fraud indicators"""
-        text = f"{title} {content}".lower()
-        risk_score = 0
-        fraud_indicators = []
+    def _find_literals(self, text: str) -> set:
+        """Every fraud keyword, guarantee word and contact word occurring in text"""
+        if self._literal_automaton is not None:
+            return {literal for _, literal in self._literal_automaton.iter(text.lower())}
+        found = set()
+        for match in self._literal_re.finditer(text):
+            found.update(self._contained_literals[match.group(1).lower()])
+        return found
+    
+    def _scan(self, text: str, hits: np.ndarray) -> Dict[int, str]:
+        """Mark the rules text matches in hits; returns the first match of each high-risk pattern"""
+        found_literals = self._find_literals(text)
         
         # Check for fraud keywords
-        for keyword in self.fraud_keywords:
-            if keyword in text:
-                risk_score += 15
-                fraud_indicators.append(f"Suspicious keyword: '{keyword}'")
-        
-        # Check for high-risk patterns
-        for pattern in self.high_risk_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                risk_score += 20
-                fraud_indicators.append(f"High-risk pattern: {matches[0]}")
+        for i, keyword in enumerate(self.fraud_keywords):
+            if keyword in found_literals:
+                hits[i] = True
         
         # Additional risk factors
-        if any(word in text for word in ["guaranteed", "risk-free", "sure shot"]):
-            risk_score += 25
-            fraud_indicators.append("Unrealistic guarantees detected")
+        hits[self._guarantee_index] = any(word in found_literals for word in self.guarantee_words)
+        hits[self._contact_index] = any(word in found_literals for word in self.contact_words)
+        
+        # The score is capped at 100, so once the literal hits reach it the pattern scan
+        # can't change the verdict; skip it for the most obvious posts
+        samples = {}
+        if hits @ self._rule_weights >= 100:
+            return samples
         
-        if any(word in text for word in ["whatsapp", "telegram", "dm me", "contact"]):
-            risk_score += 20
-            fraud_indicators.append("Suspicious contact methods")
+        # Check for high-risk patterns, keeping the first match of each
+        if self._pattern_re2 is not None:
+            for i, pattern in enumerate(self._pattern_re2):
+                match = pattern.search(text)
+                if match:
+                    samples[self._pattern_offset + i] = match.group(0)
+                    hits[self._pattern_offset + i] = True
+            return samples
+        for match in self._pattern_re.finditer(text):
+            index = self._pattern_offset + int(match.lastgroup[1:])
+            if index not in samples:
+                samples[index] = match.group(match.lastgroup)
+                hits[index] = True
+        return samples
+    
+    def analyze_posts(self, posts: List[tuple]) -> List[tuple]:
+        """analyze_fraud_risk for a batch of (title, content) pairs, scoring them all at once"""
+        hits = np.zeros((len(posts), len(self._rule_weights)), dtype=bool)
+        samples = [self._scan(f"{title} {content}", hits[row]) for row, (title, content) in enumerate(posts)]
         
         # Cap risk score at 100
-        risk_score = min(risk_score, 100)
+        scores = np.minimum(hits.astype(np.int32) @ self._rule_weights, 100)
         
-        # Determine alert level and fraud status
-        is_fraud = risk_score >= 60
-        if risk_score >= 80:
-            alert_level = "critical"
-        elif risk_score >= 60:
-            alert_level = "high"
-        elif risk_score >= 40:
-            alert_level = "medium"
-        else:
-            alert_level = "low"
+        results = []
+        for row, risk_score in enumerate(scores.tolist()):
+            # Determine alert level and fraud status
+            is_fraud = risk_score >= 60
+            if risk_score >= 80:
+                alert_level = "critical"
+            elif risk_score >= 60:
+                alert_level = "high"
+            elif risk_score >= 40:
+                alert_level = "medium"
+            else:
+                alert_level = "low"
+            
+            fraud_indicators = [
+                self._rule_labels[index] or f"High-risk pattern: {samples[row][index]}"
+                for index in np.flatnonzero(hits[row]).tolist()
+            ]
+            analysis_summary = "; ".join(fraud_indicators) if fraud_indicators else "No significant fraud indicators detected"
+            results.append((is_fraud, risk_score, alert_level, analysis_summary))
+        return results
+    
+    def analyze_fraud_risk(self, title: str, content: str) -> tuple[bool, int, str, str]:
+        """Analyze post for fraud indicators"""
+        return self.analyze_posts([(title, content)])[0]
+    
+    def _worker_reddit(self):
+        """The calling fetch worker's own read-only praw.Reddit"""
+        state = self._thread_state
+        if getattr(state, "config", None) is not self._reddit_config:
+            state.reddit = praw.Reddit(**self._reddit_config)
+            state.reddit.read_only = True
+            state.config = self._reddit_config
+        return state.reddit
+    
+    def _fetch_subreddit(self, subreddit_name: str, limit: int) -> list:
+        """The hot submissions of one subreddit, in hot order; runs on a fetch worker"""
+        return list(self._worker_reddit().subreddit(subreddit_name).hot(limit=limit))
+    
+    @staticmethod
+    def _link_targets(submission) -> set:
+        """Keys under which a submission duplicates another: itself, its crosspost parent, its link"""
+        targets = {f"t3_{submission.id}"}
+        # Read from the listing data directly: a missing attribute on a lazy Submission
+        # would otherwise trigger a fetch of the whole post
+        parent = vars(submission).get("crosspost_parent")
+        if parent:
+            targets.add(parent)
+        if not submission.is_self:
+            targets.add(submission.url)
+        return targets
+    
+    def _analyze_fetched(self, fetched: Dict[str, list]) -> Dict[str, list]:
+        """
+        Drop submissions whose link target already appeared in another monitored subreddit,
+        then analyze the rest as one batch. Returns subreddit -> [(hot rank, PostRow)].
+        """
+        # The copy ranked highest in its subreddit's hot list is kept (ties go to the earlier
+        # subreddit), so a shallower read sliced by rank keeps the copy its own fetch would
+        ranked = sorted(
+            (
+                (rank, order, name, submission)
+                for order, (name, submissions) in enumerate(fetched.items())
+                for rank, submission in enumerate(submissions)
+            ),
+            key=lambda item: item[:2]
+        )
+        kept = []
+        seen_targets = set()
+        for rank, _, name, submission in ranked:
+            targets = self._link_targets(submission)
+            if seen_targets.isdisjoint(targets):
+                seen_targets |= targets
+                kept.append((rank, name, submission))
         
-        analysis_summary = "; ".join(fraud_indicators) if fraud_indicators else "No significant fraud indicators detected"
+        # Posts with no text besides links have nothing to scan
+        verdicts = [LINK_ONLY_VERDICT] * len(kept)
+        scanned = [
+            i for i, (_, _, submission) in enumerate(kept)
+            if URL_RE.sub("", f"{submission.title} {submission.selftext or ''}").strip()
+        ]
+        scanned_verdicts = self.analyze_posts([(kept[i][2].title, kept[i][2].selftext or "") for i in scanned])
+        for i, verdict in zip(scanned, scanned_verdicts):
+            verdicts[i] = verdict
         
-        return is_fraud, risk_score, alert_level, analysis_summary
+        posts = {name: [] for name in fetched}
+        for (rank, name, submission), verdict in zip(kept, verdicts):
+            # Positional, in RedditPost field order
+            posts[name].append((rank, PostRow._make((
+                submission.id,
+                f"r/{name}",
+                submission.title,
+                submission.selftext or "",
+                str(submission.author) if submission.author else "[deleted]",
+                submission.created_utc,
+                submission.score,
+                submission.num_comments,
+                f"https://reddit.com{submission.permalink}",
+                *verdict,
+                datetime.fromtimestamp(submission.created_utc).isoformat()
+            ))))
+        return posts
+    
+    def _collect_posts(self, limit: int) -> PostBatch:
+        """Fetch and analyze posts from monitored subreddits for a limit, unsorted and cached"""
+        subreddits = frozenset(self.monitored_subreddits)
+        per_subreddit = limit // len(subreddits) or 10
+        key = (subreddits, per_subreddit)
+        with self._fetch_lock:
+            now = time.time()
+            cached = self._posts_cache.get(key)
+            if cached is not None and now - cached[0] < RECENT_POSTS_TTL:
+                return cached[1]
+            
+            # A fresh fetch that went at least as deep already holds each subreddit's top
+            # per_subreddit hot posts, so slice it by rank instead of calling Reddit again
+            hot = self._hot_cache.get(subreddits)
+            if hot is None or now - hot[0] >= RECENT_POSTS_TTL or hot[1] < per_subreddit:
+                try:
+                    names = list(subreddits)
+                    fetched = self._fetch_executor.map(lambda name: self._fetch_subreddit(name, per_subreddit), names)
+                    hot = (now, per_subreddit, self._analyze_fetched(dict(zip(names, fetched))))
+                except Exception as e:
+                    logger.error(f"Error fetching Reddit posts: {e}")
+                    return EMPTY_BATCH
+                self._hot_cache[subreddits] = hot
+            
+            fetched_at, _, hot_posts = hot
+            posts = [
+                post
+                for ranked_posts in hot_posts.values()
+                for _, post in takewhile(lambda item: item[0] < per_subreddit, ranked_posts)
+            ]
+            batch = PostBatch.from_posts(posts)
+            self._posts_cache[key] = (fetched_at, batch)
+            return batch
     
     def get_recent_posts(self, limit: int = 50) -> List[RedditPost]:
         """Get recent posts from monitored subreddits"""
         if not self.reddit or not self.monitored_subreddits:
             return []
         
-        posts = []
-        
-        try:
-            for subreddit_name in self.monitored_subreddits:
-                subreddit = self.reddit.subreddit(subreddit_name)
-                
-                # Get recent posts (hot, new, rising)
-                for submission in subreddit.hot(limit=limit//len(self.monitored_subreddits) or 10):
-                    # Analyze for fraud
-                    is_fraud, risk_score, alert_level, analysis = self.analyze_fraud_risk(
-                        submission.title, 
-                        submission.selftext or ""
-                    )
-                    
-                    post = RedditPost(
-                        id=submission.id,
-                        subreddit=f"r/{subreddit_name}",
-                        title=submission.title,
-                        content=submission.selftext or "",
-                        author=str(submission.author) if submission.author else "[deleted]",
-                        created_utc=submission.created_utc,
-                        score=submission.score,
-                        num_comments=submission.num_comments,
-                        url=f"https://reddit.com{submission.permalink}",
-                        is_fraud=is_fraud,
-                        risk_score=risk_score,
-                        alert_level=alert_level,
-                        analysis_summary=analysis
-                    )
-                    
-                    posts.append(post)
-            
-            # Sort by creation time (newest first)
-            posts.sort(key=lambda x: x.created_utc, reverse=True)
-            return posts[:limit]
-            
-        except Exception as e:
-            logger.error(f"Error fetching Reddit posts: {e}")
-            return []
+        # Newest first
+        newest = heapq.nlargest(limit, self._collect_posts(limit).posts, key=lambda x: x.created_utc)
+        return [RedditPost(*row) for row in newest]
     
     def get_fraud_alerts(self, limit: int = 20) -> List[Dict]:
         """Get recent fraud alerts from Reddit"""
-        posts = self.get_recent_posts(limit * 2)  # Get more posts to filter for fraud
-        fraud_posts = [post for post in posts if post.is_fraud][:limit]
+        if not self.reddit or not self.monitored_subreddits:
+            return []
+        
+        # Fetch more posts to filter for fraud, then keep only the newest fraud posts
+        fraud_posts = heapq.nlargest(
+            limit,
+            (post for post in self._collect_posts(limit * 2).posts if post.is_fraud),
+            key=lambda x: x.created_utc
+        )
         
         return [
             {
@@ -231,7 +461,7 @@ class RedditMonitor:
                 "content": post.title,
                 "risk_score": post.risk_score,
                 "alert_level": post.alert_level,
-                "timestamp": datetime.fromtimestamp(post.created_utc).isoformat(),
+                "timestamp": post.created_iso,
                 "url": post.url,
                 "analysis": post.analysis_summary
             }
@@ -249,21 +479,22 @@ class RedditMonitor:
                 "active": False
             }
         
-        # Get recent posts for stats
-        recent_posts = self.get_recent_posts(100)
+        # Get recent posts for stats, as arrays; only the newest 100 count
+        batch = self._collect_posts(100)
+        created_utc, risk_score, is_fraud = batch.created_utc, batch.risk_score, batch.is_fraud
+        if created_utc.size > 100:
+            newest = np.argsort(-created_utc, kind="stable")[:100]
+            created_utc, risk_score, is_fraud = created_utc[newest], risk_score[newest], is_fraud[newest]
         
         # Calculate weekly stats (last 7 days)
-        week_ago = datetime.now() - timedelta(days=7)
-        weekly_posts = [
-            post for post in recent_posts 
-            if datetime.fromtimestamp(post.created_utc) > week_ago
-        ]
+        week_ago = (datetime.now() - timedelta(days=7)).timestamp()
+        weekly = created_utc > week_ago
         
         return {
             "total_subreddits": len(self.monitored_subreddits),
-            "weekly_posts": len(weekly_posts),
-            "weekly_fraud_detected": len([p for p in weekly_posts if p.is_fraud]),
-            "weekly_high_risk": len([p for p in weekly_posts if p.risk_score >= 80]),
+            "weekly_posts": int(weekly.sum()),
+            "weekly_fraud_detected": int((weekly & is_fraud).sum()),
+            "weekly_high_risk": int((weekly & (risk_score >= 80)).sum()),
             "active": True
         }
     
@@ -2,6 +2,7 @@
 Add a new endpoint for the rules-based regulatory verification
 """
 
+import asyncio
 from fastapi import APIRouter, Request
 from regulatory_verification import verify_regulatory_compliance
 
@@ -21,8 +22,9 @@ async def regulatory_verify(request: Request):
         if not message:
             return {"error": "No message provided."}
             
-        # Use the rules-based verification system
-        result = verify_regulatory_compliance(message, company)
+        # Use the rules-based verification system; it does blocking HTTP and ChromaDB
+        # lookups, so run it off the event loop
+        result = await asyncio.to_thread(verify_regulatory_compliance, message, company)
         
         return result
         
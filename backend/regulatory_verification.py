@@ -4,12 +4,23 @@ structured data rather than relying primarily on LLMs.
 """
 import os
 import re
+import copy
 import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from cachetools import TTLCache
 from datetime import datetime, timedelta
 from chromadb import Client
 from chromadb.config import Settings
 
+try:
+    import re2  # google-re2: linear-time matching, no backtracking on adversarial input
+except ImportError:
+    re2 = None
+
 # --- Structured Regulatory Rules ---
 # These are extracted from SEBI/BSE/NSE guidelines and circulars
 MARKET_MANIPULATION_RULES = [
@@ -86,6 +97,25 @@ MARKET_MANIPULATION_RULES = [
     }
 ]
 
+def _compile_rule_pattern(pattern):
+    """Case-insensitive regex, on RE2 when google-re2 is installed"""
+    if re2 is not None:
+        return re2.compile("(?i)" + pattern)
+    return re.compile(pattern, re.IGNORECASE)
+
+# One compiled alternation per rule, so a message is scanned once per rule; the named
+# groups map a match back to the pattern that produced it
+_RULE_PATTERNS = {
+    rule["id"]: [_compile_rule_pattern(pattern) for pattern in rule["indicator_patterns"]]
+    for rule in MARKET_MANIPULATION_RULES
+}
+_RULE_RES = {
+    rule["id"]: _compile_rule_pattern(
+        "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(rule["indicator_patterns"]))
+    )
+    for rule in MARKET_MANIPULATION_RULES
+}
+
 # IPO regulations and checks
 IPO_REGULATIONS = {
     "min_company_age": 3,  # 3 years operational history
@@ -98,20 +128,34 @@ IPO_REGULATIONS = {
 # --- Alternative Market Data Sources ---
 # Use open data sources instead of direct BSE/NSE APIs
 
+# One pooled session for the public data lookups, and an hour's cache of their
+# successful responses, since listings and the IPO calendar rarely change
+HTTP_CACHE_TTL = 3600
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+_http_session = requests.Session()
+_http_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+_company_data_cache = TTLCache(maxsize=1024, ttl=HTTP_CACHE_TTL)
+_ipo_list_cache = TTLCache(maxsize=1, ttl=HTTP_CACHE_TTL)
+_http_cache_lock = threading.Lock()
+
 def get_public_company_data(symbol):
     """Get company data from public sources instead of direct BSE/NSE APIs"""
+    with _http_cache_lock:
+        cached = _company_data_cache.get(symbol)
+    if cached is not None:
+        return dict(cached)
+    
     try:
         # Check if company appears in NSE/BSE listing
         # Using screener.in for basic data
         url = f"https://www.screener.in/api/company/{symbol}/"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=5)
+        response = _http_session.get(url, headers=HTTP_HEADERS, timeout=5)
         
         if response.status_code == 200:
             data = response.json()
-            return {
+            result = {
                 "found": True,
                 "name": data.get("name", ""),
                 "exchange": data.get("exchange", ""),
@@ -120,6 +164,9 @@ def get_public_company_data(symbol):
                 "current_price": data.get("current_price", 0),
                 "url": f"https://www.screener.in/company/{symbol}/"
             }
+            with _http_cache_lock:
+                _company_data_cache[symbol] = result
+            return dict(result)
         
         # If screener.in fails, try other sources
         # This is an example and would need to be expanded with more sources
@@ -133,19 +180,29 @@ def get_public_company_data(symbol):
             "error": str(e)
         }
 
+def _get_ipo_list():
+    """The mainboard IPO list, or None if the source did not answer with 200"""
+    with _http_cache_lock:
+        cached = _ipo_list_cache.get("mainboard")
+    if cached is not None:
+        return cached
+    
+    # Public sources for IPO data
+    url = "https://www.chittorgarh.com/api/ipo/mainboard_ipo_list/?year=2023"
+    response = _http_session.get(url, headers=HTTP_HEADERS, timeout=5)
+    if response.status_code != 200:
+        return None
+    ipo_data = response.json()
+    with _http_cache_lock:
+        _ipo_list_cache["mainboard"] = ipo_data
+    return ipo_data
+
 def verify_ipo_status(company_name):
     """Check if a company has a legitimate ongoing or upcoming IPO"""
     try:
-        # Public sources for IPO data
-        url = "https://www.chittorgarh.com/api/ipo/mainboard_ipo_list/?year=2023"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=5)
+        ipo_data = _get_ipo_list()
         
-        if response.status_code == 200:
-            ipo_data = response.json()
-            
+        if ipo_data is not None:
             # Check if company is in the list
             company_ipos = [ipo for ipo in ipo_data if company_name.lower() in ipo.get("company_name", "").lower()]
             
@@ -180,20 +237,23 @@ def check_regulatory_compliance(message):
     Check if message complies with regulatory rules
     Returns violations with specific regulations rather than LLM guesses
     """
-    message_lower = message.lower()
     violations = []
     
     for rule in MARKET_MANIPULATION_RULES:
-        for pattern in rule["indicator_patterns"]:
-            if re.search(pattern, message_lower, re.IGNORECASE):
-                violations.append({
-                    "rule_id": rule["id"],
-                    "category": rule["category"],
-                    "description": rule["description"],
-                    "source": rule["source"],
-                    "matched_pattern": pattern
-                })
-                break  # Only report each rule once
+        match = _RULE_RES[rule["id"]].search(message)
+        if match:  # Only report each rule once
+            # The union reports the leftmost match; report the first pattern in rule order,
+            # which can only be one of the patterns listed before it
+            index = int(match.lastgroup[1:])
+            patterns = _RULE_PATTERNS[rule["id"]]
+            index = next((i for i in range(index) if patterns[i].search(message)), index)
+            violations.append({
+                "rule_id": rule["id"],
+                "category": rule["category"],
+                "description": rule["description"],
+                "source": rule["source"],
+                "matched_pattern": rule["indicator_patterns"][index]
+            })
     
     return {
         "compliant": len(violations) == 0,
@@ -208,69 +268,132 @@ def get_ipo_regulatory_requirements():
 # --- RAG-based SEBI Regulation Retrieval ---
 # This uses vector DB but without relying primarily on LLM reasoning
 
+# Opened on first use and kept, so the index isn't reloaded from disk on every query
+_sebi_collection = None
+_chroma_lock = threading.Lock()
+
+def _get_sebi_collection():
+    global _sebi_collection
+    if _sebi_collection is None:
+        with _chroma_lock:
+            if _sebi_collection is None:
+                chroma_db_path = os.path.join(os.path.dirname(__file__), "chroma_db")
+                chroma_client = Client(Settings(persist_directory=chroma_db_path))
+                _sebi_collection = chroma_client.get_or_create_collection("sebi_docs")
+    return _sebi_collection
+
 def get_relevant_regulations(query, use_gemini_embed=False):
     """
     Get relevant regulations using vector search
     This is RAG but focused on retrieval without heavy LLM reasoning
     """
+    return get_relevant_regulations_batch([query], use_gemini_embed)[0]
+
+def get_relevant_regulations_batch(queries, use_gemini_embed=False):
+    """
+    get_relevant_regulations for several queries at once: one batched embedding
+    call and one ChromaDB query, returning a result per query in order
+    """
+    queries = list(queries)
     try:
-        # Initialize ChromaDB
-        chroma_db_path = os.path.join(os.path.dirname(__file__), "chroma_db")
-        chroma_client = Client(Settings(persist_directory=chroma_db_path))
-        sebi_collection = chroma_client.get_or_create_collection("sebi_docs")
+        sebi_collection = _get_sebi_collection()
         
         # Use embeddings if available, otherwise use keyword search
         if use_gemini_embed:
             # Import only if needed
-            from llm_utils import gemini_embed
-            query_emb = gemini_embed(query)
-            results = sebi_collection.query(query_embeddings=[query_emb], n_results=3)
+            from llm_utils import gemini_embed_batch
+            query_embs = gemini_embed_batch(queries)
+            results = sebi_collection.query(query_embeddings=query_embs, n_results=3)
         else:
             # Use keyword search as fallback
-            results = sebi_collection.query(query_texts=[query], n_results=3)
-            
-        regulations = []
-        if results and 'documents' in results and results['documents']:
-            for i, doc in enumerate(results['documents'][0]):
-                regulations.append({
-                    "text": doc,
-                    "relevance": results.get('distances', [[]])[0][i] if 'distances' in results else None,
-                    "id": results.get('ids', [[]])[0][i] if 'ids' in results else f"doc_{i}"
-                })
+            results = sebi_collection.query(query_texts=queries, n_results=3)
         
-        return {
-            "success": True,
-            "count": len(regulations),
-            "regulations": regulations
-        }
+        batch = []
+        for q in range(len(queries)):
+            regulations = []
+            if results and 'documents' in results and results['documents']:
+                for i, doc in enumerate(results['documents'][q]):
+                    regulations.append({
+                        "text": doc,
+                        "relevance": results['distances'][q][i] if results.get('distances') else None,
+                        "id": results['ids'][q][i] if results.get('ids') else f"doc_{i}"
+                    })
+            batch.append({
+                "success": True,
+                "count": len(regulations),
+                "regulations": regulations
+            })
+        return batch
     except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "regulations": []
-        }
+        return [
+            {
+                "success": False,
+                "error": str(e),
+                "regulations": []
+            }
+            for _ in queries
+        ]
 
 # --- Main Verification Function ---
 
+# Verdicts for repeated (message, company) pairs; the TTL is short because IPO status
+# and the regulations store can change underneath a cached verdict. Like the HTTP
+# caches, only verdicts whose lookups all succeeded are kept.
+VERDICT_CACHE_TTL = 600
+_verdict_cache = TTLCache(maxsize=1024, ttl=VERDICT_CACHE_TTL)
+_verdict_cache_lock = threading.Lock()
+
+def _lookup_failed(result):
+    """True for a lookup result that reports an error, or a lookup that returned nothing"""
+    return result is None or "error" in result or result.get("success") is False
+
 def verify_regulatory_compliance(message, company_name=None):
     """
     Main function to verify regulatory compliance
     Uses rule-based approach instead of relying on LLM
     """
-    # 1. Check for rule violations in the message
-    compliance_check = check_regulatory_compliance(message)
-    
-    # 2. Get relevant SEBI regulations
-    relevant_regs = get_relevant_regulations(message)
-    
-    # 3. Company verification
-    company_data = None
-    ipo_data = None
-    if company_name:
-        company_data = get_public_company_data(company_name)
-        if not company_data.get("found", False):
-            # Try to check for IPO
-            ipo_data = verify_ipo_status(company_name)
+    key = hashlib.blake2b(
+        f"{message}\x00{company_name or ''}".encode("utf-8"), digest_size=16
+    ).digest()
+    with _verdict_cache_lock:
+        cached = _verdict_cache.get(key)
+    if cached is None:
+        cached, failed = _verify_regulatory_compliance(message, company_name)
+        if not failed:
+            with _verdict_cache_lock:
+                _verdict_cache[key] = cached
+    # The nested lists end up in response payloads, so never hand out the cached dict itself
+    return copy.deepcopy(cached)
+
+def _verify_regulatory_compliance(message, company_name):
+    """The verdict, and whether any lookup behind it failed"""
+    # The Chroma query and the public data lookups are independent I/O, so they run
+    # alongside the rule scan; the IPO check is started speculatively and only used
+    # when the company isn't listed
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        regs_future = executor.submit(get_relevant_regulations, message)
+        company_future = ipo_future = None
+        if company_name:
+            company_future = executor.submit(get_public_company_data, company_name)
+            ipo_future = executor.submit(verify_ipo_status, company_name)
+        
+        # 1. Check for rule violations in the message
+        compliance_check = check_regulatory_compliance(message)
+        
+        # 2. Get relevant SEBI regulations
+        relevant_regs = regs_future.result()
+        failed = _lookup_failed(relevant_regs)
+        
+        # 3. Company verification
+        company_data = None
+        ipo_data = None
+        if company_name:
+            company_data = company_future.result()
+            failed = failed or _lookup_failed(company_data)
+            if not company_data.get("found", False):
+                # Try to check for IPO
+                ipo_data = ipo_future.result()
+                failed = failed or _lookup_failed(ipo_data)
     
     # Determine if the message is compliant
     is_compliant = compliance_check.get("compliant", False)
@@ -290,7 +413,7 @@ def verify_regulatory_compliance(message, company_name=None):
         "relevant_regulations": relevant_regs.get("regulations", []),
         "company_data": company_data,
         "ipo_data": ipo_data
-    }
+    }, failed
 
 # For testing
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+"""
+In-process TTL cache for the async social monitoring routes.
+
+Concurrent misses on the same key are single-flighted: the first caller runs the
+handler and everyone else awaits its result instead of hitting the monitors again.
+Responses can also carry an ETag, so clients revalidate with a 304 instead of
+refetching; only constant responses may be stored by shared caches for a while.
+"""
+
+import asyncio
+import functools
+import hashlib
+import time
+import orjson
+from fastapi import Request, Response
+
+# Prune expired entries once the cache grows past this many keys
+MAX_CACHE_ENTRIES = 256
+
+# key -> (expires_at or None for no expiry, value)
+_cache = {}
+# key -> asyncio.Future for calls currently in progress (see single_flight)
+_inflight = {}
+
+def _prune(now):
+    for key in [k for k, (expires_at, _) in _cache.items() if expires_at is not None and expires_at <= now]:
+        del _cache[key]
+
+async def single_flight(key, func, *args, **kwargs):
+    """
+    Await func(*args, **kwargs), sharing one call among concurrent callers with the
+    same key. Later callers get the first call's result or exception.
+    """
+    pending = _inflight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        value = await func(*args, **kwargs)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark retrieved so an unawaited future does not log a warning
+        future.exception()
+        raise
+    finally:
+        _inflight.pop(key, None)
+    
+    future.set_result(value)
+    return value
+
+def ttl_cache(seconds=None):
+    """
+    Cache an async function's result per arguments
+    
+    Args:
+        seconds: Time-to-live in seconds, or None to keep the result forever
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+            entry = _cache.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+                return entry[1]
+            
+            async def load():
+                value = await func(*args, **kwargs)
+                now = time.monotonic()
+                if len(_cache) >= MAX_CACHE_ENTRIES:
+                    _prune(now)
+                _cache[key] = (None if seconds is None else now + seconds, value)
+                return value
+            
+            return await single_flight(key, load)
+        return wrapper
+    return decorator
+
+def invalidate():
+    """Drop all cached results, e.g. after the monitored groups change"""
+    _cache.clear()
+
+def invalidates_cache(func):
+    """Clear the cache once the wrapped async function finishes"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            invalidate()
+    return wrapper
+
+def encode_json(payload):
+    """Serialize a payload once, returning (body, ETag) where the ETag hashes the body"""
+    body = orjson.dumps(payload)
+    return body, f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+def etag_response(request: Request, encoded, max_age: int = None) -> Response:
+    """
+    JSON response for an encode_json() result, or 304 if the client already has it.
+    Without max_age the client must revalidate on every use, since the data can
+    change (e.g. right after a group is added); pass max_age only for constant data.
+    """
+    body, etag = encoded
+    cache_control = f"public, max-age={max_age}" if max_age is not None else "private, no-cache"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
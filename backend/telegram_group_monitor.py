@@ -45,6 +45,9 @@ class TelegramGroupMonitor:
         self.monitored_groups = set()
         self.alert_callbacks = []
         self.running = False
+        # str(group_id), group name and username -> group_id for active groups
+        self._identifier_index = {}
+        self._identifier_index_loaded = False
         
         # Initialize database
         self._init_database()
@@ -137,14 +140,29 @@ class TelegramGroupMonitor:
         """Load monitored groups from database"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
-        cursor.execute("SELECT group_id FROM monitored_groups WHERE status = 'active'")
+        cursor.execute("SELECT group_id, group_name, group_username FROM monitored_groups WHERE status = 'active'")
         
-        for (group_id,) in cursor.fetchall():
+        for group_id, group_name, group_username in cursor.fetchall():
             self.monitored_groups.add(group_id)
+            self._index_group(group_id, group_name, group_username)
         
         conn.close()
+        self._identifier_index_loaded = True
         logger.info(f"Loaded {len(self.monitored_groups)} monitored groups")
     
+    def _index_group(self, group_id: int, group_name: str, group_username: Optional[str]):
+        for identifier in (str(group_id), group_name, group_username):
+            if identifier:
+                self._identifier_index.setdefault(identifier, group_id)
+    
+    def resolve_group(self, identifier: str) -> Optional[int]:
+        """Resolve a group id, name or username to the id of an active monitored group"""
+        if not self._identifier_index_loaded:
+            for group in self.get_monitored_groups():
+                self._index_group(group["group_id"], group["group_name"], group["group_username"])
+            self._identifier_index_loaded = True
+        return self._identifier_index.get(identifier)
+    
     async def add_group_by_link(self, group_link: str) -> Dict:
         """Add a group/channel to monitoring by invite link or username"""
         try:
@@ -179,6 +197,7 @@ class TelegramGroupMonitor:
             
             # Add to monitoring set
             self.monitored_groups.add(group_id)
+            self._index_group(group_id, group_name, group_username)
             
             logger.info(f"Added {entity_type.lower()} to monitoring: {group_name} (ID: {group_id})")
             return {
@@ -203,6 +222,9 @@ class TelegramGroupMonitor:
             conn.close()
             
             self.monitored_groups.discard(group_id)
+            self._identifier_index = {
+                identifier: gid for identifier, gid in self._identifier_index.items() if gid != group_id
+            }
             
             logger.info(f"Removed group {group_id} from monitoring")
             return {"success": True, "message": "Group removed from monitoring"}